@@ -0,0 +1,81 @@
+"""
+测量每个请求的鉴权开销：直接调用 JWTAuthMiddleware 和 get_current_user，
+下游应用什么都不做。对比旧做法（中间件和路由依赖各做一次 jwt.decode），
+以及当前做法在验证缓存未命中和命中时的耗时。
+
+用法（在 backend 目录下）：python -m bench.auth_overhead
+"""
+import asyncio
+import os
+import time
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from starlette.requests import Request
+import security.jwt as security_jwt
+from middleware.jwt_auth import JWTAuthMiddleware
+from security.get_current_user import get_current_user
+
+REQUESTS = 20000
+
+
+def _scope(token):
+    return {"type": "http", "path": "/user/info", "method": "GET",
+            "headers": [(b"authorization", f"Bearer {token}".encode())]}
+
+
+async def _receive():
+    return {"type": "http.request", "body": b""}
+
+
+async def _send(message):
+    pass
+
+
+async def _route(scope, receive, send):
+    # 路由依赖：从 request.state 读取中间件已验证的 claims
+    get_current_user(Request(scope), HTTPAuthorizationCredentials(
+        scheme="Bearer", credentials=""))
+
+
+def _legacy_request(token):
+    # 旧做法：中间件和 get_current_user 各自解码并校验签名，每次重建排除路径列表
+    exclude_paths = ["", "/", "/_ah/warmup", "/auth/login", "/docs", "/openapi.json",
+                     "/redoc", "/favicon.ico", "/user/register", "/user/login"]
+    assert "/user/info" not in exclude_paths
+    for _ in range(2):
+        jwt.decode(token, security_jwt.SECRET_KEY, algorithms=[security_jwt.ALGORITHM])
+
+
+async def _measure(run):
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await run()
+    return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+async def main():
+    token = security_jwt.generate_token({"user_id": 1, "user_type": "user"})
+    middleware = JWTAuthMiddleware(_route)
+
+    async def legacy():
+        _legacy_request(token)
+
+    async def cold():
+        security_jwt._verified_tokens.clear()
+        await middleware(_scope(token), _receive, _send)
+
+    async def cached():
+        await middleware(_scope(token), _receive, _send)
+
+    print(f"{'auth per request':>26} {'us':>8}")
+    for name, run in (("legacy, decode twice", legacy),
+                      ("middleware, cache miss", cold),
+                      ("middleware, cache hit", cached)):
+        print(f"{name:>26} {await _measure(run):>8.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
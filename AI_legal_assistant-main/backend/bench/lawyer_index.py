@@ -0,0 +1,86 @@
+"""
+用合成的律师数据测试 LawyerIndex：构建索引的耗时、每次召回候选的耗时，
+以及推荐提示词中放入全部律师与只放入前 K 名候选时的大小。不需要数据库。
+
+用法（在 backend 目录下）：python -m bench.lawyer_index
+"""
+import os
+import random
+import statistics
+import time
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite://")
+
+from services.lawyer_index import LawyerIndex, LAWYER_CANDIDATES_K
+from utils.generate_prompt import generate_recommend_laywer_prompt
+
+BENCH_LAWYERS = int(os.getenv("BENCH_LAWYERS", "10000"))
+SEARCHES = 200
+EXPERTISE = ("Personal Injury", "Family Law", "Employment Law", "Criminal Defense",
+             "Property Law", "Immigration", "Contract Law", "Consumer Law", "Tax Law")
+LOCATIONS = ("Sydney", "Melbourne", "Brisbane", "Perth", "Adelaide", "Hobart",
+             "Canberra", "Darwin", "Gold Coast", "Newcastle")
+WORDS = ("experienced", "litigation", "negotiation", "settlement", "tribunal", "appeal",
+         "compensation", "workplace", "injury", "custody", "divorce", "lease", "tenancy",
+         "dismissal", "contract", "dispute", "visa", "criminal", "court", "mediation")
+CASES = (
+    ("Employment Law", "I was dismissed without notice after reporting a workplace injury", "Sydney"),
+    ("Family Law", "Custody dispute after divorce, need mediation", "Perth"),
+    ("Contract Law", "Landlord kept the lease bond and refuses to settle", "Hobart"),
+)
+
+
+def _lawyers(rng, count):
+    lawyers = []
+    for lawyer_id in range(1, count + 1):
+        rating = round(rng.uniform(3.0, 5.0), 1)
+        price = rng.randrange(150, 800, 50)
+        lawyers.append({
+            "id": lawyer_id,
+            "name": f"Lawyer {lawyer_id}",
+            "email": f"lawyer{lawyer_id}@example.com",
+            "expertise": ", ".join(rng.sample(EXPERTISE, rng.randint(1, 3))),
+            "price": f"${price} - ${price + 200} per hour",
+            "rating": f"{rating}/5",
+            "introduction": " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 120))),
+            "location": rng.choice(LOCATIONS),
+            "law_firm": f"Firm {lawyer_id % 500}",
+            "firm_address": f"{lawyer_id} George Street",
+            "price_min": float(price),
+            "price_max": float(price + 200),
+            "rating_value": rating,
+        })
+    return lawyers
+
+
+def _prompt_size(lawyers, case):
+    case_type, description, location = case
+    return len(generate_recommend_laywer_prompt(
+        lawyers, "[]", case_type, description, location, "2024-10-25T14:30:00"))
+
+
+def main():
+    lawyers = _lawyers(random.Random(0), BENCH_LAWYERS)
+
+    start = time.perf_counter()
+    index = LawyerIndex(lawyers)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{BENCH_LAWYERS:,} lawyers, index built in {build_ms:.0f} ms")
+
+    timings = []
+    for number in range(SEARCHES):
+        case = CASES[number % len(CASES)]
+        start = time.perf_counter()
+        index.search(*case)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"search: median {statistics.median(timings):.2f} ms, "
+          f"p95 {statistics.quantiles(timings, n=20)[-1]:.2f} ms")
+
+    print(f"{'case':>16} {'all lawyers':>14} {f'top {LAWYER_CANDIDATES_K}':>10}")
+    for case in CASES:
+        candidates = index.search(*case)
+        print(f"{case[0]:>16} {_prompt_size(lawyers, case):>12,} B "
+              f"{_prompt_size(candidates, case):>8,} B")
+
+
+if __name__ == "__main__":
+    main()
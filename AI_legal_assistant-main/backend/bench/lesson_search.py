@@ -0,0 +1,103 @@
+"""
+比较课程搜索的耗时：旧做法按标题 LIKE '%...%' 分页后再 COUNT 扫描一遍，
+新做法为 LearnService.leason_list（MySQL 上使用 ngram 全文索引，总数随分页结果一起返回）。
+表中不足 BENCH_LESSONS 条课程时先写入合成数据。
+
+DATABASE_URL 指向 MySQL 时测试全文索引，请使用专用的测试库（需先执行
+python -m migrations.leason_fulltext_index）；未设置时使用临时目录下的 SQLite 文件。
+
+用法（在 backend 目录下）：python -m bench.lesson_search
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'bench_lessons.db')}")
+
+from sqlalchemy import select, func, insert
+from database.db import engine, SessionLocal
+from models.leason_model import Leason
+from services.learn_service import LearnService
+
+BENCH_LESSONS = int(os.getenv("BENCH_LESSONS", "100000"))
+BATCH_SIZE = 5000
+REPEATS = 5
+SEARCH_TERMS = ("tenancy", "合同", "unfair dismissal", "no such topic")
+LESSON_TYPES = ("civil", "criminal", "family", "employment", "property")
+WORDS = ("contract", "tenancy", "lease", "employment", "unfair", "dismissal", "negligence",
+         "damages", "custody", "divorce", "property", "consumer", "refund", "warranty",
+         "合同", "租赁", "劳动", "赔偿", "离婚", "继承", "消费者", "侵权")
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _lessons(rng, count):
+    return [{
+        "title": _text(rng, 4),
+        "video_url": "https://example.com/video.mp4",
+        "leason_type": rng.choice(LESSON_TYPES),
+        "leason_description": _text(rng, 40),
+        "leason_summary": _text(rng, 120),
+    } for _ in range(count)]
+
+
+async def _seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Leason.__table__.create, checkfirst=True)
+    async with SessionLocal() as db:
+        existing = await db.scalar(select(func.count()).select_from(Leason))
+        rng = random.Random(existing)
+        while existing < BENCH_LESSONS:
+            batch = min(BATCH_SIZE, BENCH_LESSONS - existing)
+            await db.execute(insert(Leason), _lessons(rng, batch))
+            await db.commit()
+            existing += batch
+            print(f"Seeded {existing:,} lessons", end="\r")
+    print()
+
+
+async def _legacy_search(db, search_text, page=1, limit=10):
+    query = select(Leason).filter(Leason.title.contains(search_text))
+    lessons = (await db.scalars(query.offset((page - 1) * limit).limit(limit))).all()
+    total = await db.scalar(select(func.count()).select_from(query.subquery()))
+    return [lesson.as_dict() for lesson in lessons], total
+
+
+async def _current_search(db, search_text, page=1, limit=10):
+    response = await LearnService.leason_list(page, limit, None, search_text, None, db)
+    body = json.loads(response.body)
+    return body["leason_list"], body["total"]
+
+
+async def _median_ms(search, search_text):
+    timings = []
+    async with SessionLocal() as db:
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            _, total = await search(db, search_text)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), total
+
+
+async def main():
+    print(f"Database: {engine.dialect.name}, {BENCH_LESSONS:,} lessons")
+    await _seed()
+    # 旧做法只匹配标题，命中数少于新做法
+    print(f"{'search':>18} {'LIKE + COUNT':>12} {'hits':>7} {'leason_list':>12} {'hits':>7}")
+    for search_text in SEARCH_TERMS:
+        legacy_ms, legacy_total = await _median_ms(_legacy_search, search_text)
+        current_ms, current_total = await _median_ms(_current_search, search_text)
+        print(f"{search_text:>18} {legacy_ms:>9.1f} ms {legacy_total:>7,} "
+              f"{current_ms:>9.1f} ms {current_total:>7,}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+比较会话历史在 Redis 中的编码大小和编解码耗时：旧的 pickle 与 RedisCodec 的
+json/msgpack × none/zlib/zstd 组合。每组数据为 {"system", "history"} 整体编码一次，
+另外统计按消息逐条编码（SessionService 实际写入列表的方式）的总字节数。
+未安装 msgpack 或 zstandard 时跳过对应组合。不需要 Redis 服务。
+
+用法（在 backend 目录下）：python -m bench.redis_codec
+"""
+import pickle
+import random
+import statistics
+import time
+
+from services.redis_service import RedisCodec, SERIALIZERS, COMPRESSORS
+
+TURN_COUNTS = (20, 40, 100)
+REPEATS = 20
+# 每条消息的词数，接近一次法律咨询中用户提问和模型回答的长度
+USER_WORDS = (20, 80)
+MODEL_WORDS = (120, 300)
+WORDS = (
+    "the", "a", "of", "to", "and", "in", "is", "that", "for", "under", "section", "clause",
+    "tenant", "landlord", "lease", "bond", "notice", "days", "written", "employer",
+    "employee", "dismissal", "unfair", "compensation", "contract", "breach", "damages",
+    "tribunal", "court", "hearing", "evidence", "statement", "agreement", "termination",
+    "period", "payment", "invoice", "consumer", "refund", "warranty", "defect", "claim",
+    "limitation", "months", "years", "may", "must", "should", "could", "you", "your",
+    "their", "if", "whether", "before", "after", "within", "reasonable", "entitled",
+    "obligation", "Fair", "Work", "Commission", "NCAT", "Residential", "Tenancies", "Act",
+    "2010", "s", "88", "14", "21", "$2,500", "Sydney", "Melbourne", "mediation", "appeal",
+)
+SYSTEM_PROMPT = " ".join(random.Random(1).choice(WORDS) for _ in range(180))
+
+
+def _message(rng, role, words):
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(*words)))
+    return {"role": role, "parts": [{"text": text[0].upper() + text[1:] + "."}]}
+
+
+def _context(turns):
+    rng = random.Random(turns)
+    history = []
+    for _ in range(turns):
+        history.append(_message(rng, "user", USER_WORDS))
+        history.append(_message(rng, "model", MODEL_WORDS))
+    return {"system": SYSTEM_PROMPT, "history": history}
+
+
+def _median_us(func, value):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(value)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def _codecs():
+    yield "pickle", pickle.dumps, pickle.loads, pickle.dumps
+    for serializer in SERIALIZERS:
+        for compression in COMPRESSORS:
+            def encode(value, serializer=serializer, compression=compression):
+                # 整体编码时总是压缩，便于对比压缩算法本身
+                return RedisCodec.encode(value, serializer, compression, threshold=0)
+
+            def encode_message(value, serializer=serializer, compression=compression):
+                # 逐条消息按默认阈值决定是否压缩，与实际写入一致
+                return RedisCodec.encode(value, serializer, compression)
+
+            yield f"{serializer}+{compression}", encode, RedisCodec.decode, encode_message
+
+
+def main():
+    for turns in TURN_COUNTS:
+        context = _context(turns)
+        print(f"\n{turns} turns")
+        print(f"{'codec':>14} {'bytes':>9} {'encode':>10} {'decode':>10} {'per message':>12}")
+        for name, encode, decode, encode_message in _codecs():
+            data = encode(context)
+            assert decode(data) == context
+            per_message = sum(len(encode_message(message)) for message in context["history"])
+            print(f"{name:>14} {len(data):>9,} {_median_us(encode, context):>7.0f} us "
+                  f"{_median_us(decode, data):>7.0f} us {per_message:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+比较每轮对话在 Redis 上传输的字节数：旧做法整体 pickle 读写 session:{id}，
+新做法由 SessionService 追加消息（分别统计本地会话缓存命中与未命中）。
+基于 fakeredis，不需要 Redis 服务。
+
+用法（在 backend 目录下）：python -m bench.session_bytes
+"""
+import asyncio
+import os
+import pickle
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+
+import fakeredis
+import redis.asyncio.client
+import services.redis_service as redis_service
+
+redis_service.redis_client = fakeredis.FakeAsyncRedis()
+
+from services.session_cache import SessionCache
+from services.session_service import SessionService
+
+TURN_COUNTS = (10, 100, 500)
+USER_TEXT = "Could you explain what the contract says about termination notice? " * 3
+MODEL_TEXT = "Under clause 12 either party may terminate with thirty days written notice. " * 8
+
+_moved = [0]
+
+
+def _size(value):
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    return 0
+
+
+def _count_traffic():
+    # 统计发出的参数和收到的回复字节数
+    execute_command = redis.asyncio.client.Redis.execute_command
+    execute_pipeline = redis.asyncio.client.Pipeline.execute
+
+    async def counted_command(self, *args, **options):
+        _moved[0] += _size(args)
+        result = await execute_command(self, *args, **options)
+        _moved[0] += _size(result)
+        return result
+
+    async def counted_pipeline(self, *args, **options):
+        _moved[0] += sum(_size(command_args) for command_args, _ in self.command_stack)
+        result = await execute_pipeline(self, *args, **options)
+        _moved[0] += _size(result)
+        return result
+
+    redis.asyncio.client.Redis.execute_command = counted_command
+    redis.asyncio.client.Pipeline.execute = counted_pipeline
+
+
+def _turn_messages(number):
+    return ({"role": "user", "parts": [{"text": f"{number} {USER_TEXT}"}]},
+            {"role": "model", "parts": [{"text": f"{number} {MODEL_TEXT}"}]})
+
+
+async def _legacy_turn(session_id, number):
+    client = redis_service.redis_client
+    context = pickle.loads(await client.get(f"session:{session_id}"))
+    context["history"].extend(_turn_messages(number))
+    await client.set(f"session:{session_id}", pickle.dumps(context), ex=7200)
+
+
+async def _turn(session_id, number, cached):
+    if not cached:
+        SessionCache._entries.pop(session_id, None)
+    await SessionService.load(session_id)
+    await SessionService.append(session_id, *_turn_messages(number))
+
+
+async def _measure(turns):
+    """
+    先写入 turns - 1 轮历史，再测量第 turns 轮的传输字节数
+    """
+    client = redis_service.redis_client
+    await client.flushall()
+    await client.set("session:legacy", pickle.dumps({"system": "system prompt", "history": []}))
+    await SessionService.create("current", "system prompt")
+    for number in range(turns - 1):
+        await _legacy_turn("legacy", number)
+        await SessionService.append("current", *_turn_messages(number))
+
+    results = []
+    for run in (lambda: _legacy_turn("legacy", turns),
+                lambda: _turn("current", turns, cached=False),
+                lambda: _turn("current", turns, cached=True)):
+        await SessionService.load("current")
+        _moved[0] = 0
+        await run()
+        results.append(_moved[0])
+    return results
+
+
+async def main():
+    _count_traffic()
+    print(f"{'turns':>6} {'pickle get+set':>16} {'append, cold':>14} {'append, cached':>16}")
+    for turns in TURN_COUNTS:
+        legacy, cold, cached = await _measure(turns)
+        print(f"{turns:>6} {legacy:>16,} {cold:>14,} {cached:>16,}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
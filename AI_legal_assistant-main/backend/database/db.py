@@ -1,29 +1,71 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import os
+import dotenv
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base
+
+dotenv.load_dotenv()
+
+MYSQL_DIALECT = "mysql+aiomysql"
+# 账号和密码只从环境变量或 .env 读取，不在代码中写默认值
+MYSQL_USER = os.getenv("MYSQL_USER")
+MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD")
+MYSQL_HOST = os.getenv("MYSQL_HOST", "127.0.0.1")
+MYSQL_PORT = os.getenv("MYSQL_PORT", "3306")
+MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "ai_law")
+
+
+def _database_url():
+    """
+    设置 DATABASE_URL 时优先使用，本地开发可使用 SQLite，例如 sqlite+aiosqlite:///./ai_law.db；
+    否则必须提供 MYSQL_USER 和 MYSQL_PASSWORD
+    """
+    url = os.getenv("DATABASE_URL")
+    if url:
+        return url
+    if not MYSQL_USER or not MYSQL_PASSWORD:
+        raise RuntimeError(
+            "Database is not configured: set DATABASE_URL, or MYSQL_USER and MYSQL_PASSWORD")
+    return URL.create(
+        MYSQL_DIALECT, username=MYSQL_USER, password=MYSQL_PASSWORD, host=MYSQL_HOST,
+        port=int(MYSQL_PORT), database=MYSQL_DATABASE, query={"charset": "utf8mb4"})
 
-MYSQL_DIALECT = "mysql+pymysql"
-MYSQL_USER = "root"
-MYSQL_PASSWORD = "Root123456"
-MYSQL_HOST = "127.0.0.1"
-MYSQL_PORT = "3306"
-MYSQL_DATABASE = "ai_law"
 
 # 创建数据库连接 URL
-SQLALCHEMY_DATABASE_URL = (
-    f"{MYSQL_DIALECT}://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}?charset=utf8mb4"
-)
+SQLALCHEMY_DATABASE_URL = _database_url()
+
+# 连接池配置
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+# 回收超过该秒数的连接，需小于 MySQL 的 wait_timeout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# 连接池耗尽时等待空闲连接的秒数
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+
+def _engine_options(url):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # 内存 SQLite 只能共享同一个连接，不使用连接池参数
+        return {}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": True,
+    }
+
 
-# 创建 SQLAlchemy 引擎
-engine = create_engine(SQLALCHEMY_DATABASE_URL, pool_pre_ping=True)
+# 创建 SQLAlchemy 异步引擎
+engine = create_async_engine(
+    SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
 
-# 创建 Session 工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# 创建 Session 工厂；提交后不过期对象，避免提交后访问属性触发隐式 IO
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-def get_db():
-    session = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as session:
         yield session
-    finally:
-        session.close()
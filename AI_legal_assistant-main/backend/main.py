@@ -1,17 +1,30 @@
 import uvicorn
 import dotenv
+from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi import FastAPI
 from middleware.jwt_auth import JWTAuthMiddleware
 from database.db import engine, Base
+from services.redis_service import RedisService
 from routers.user_router import user_router
 from routers.ai_router import ai_router
 from routers.learn_router import learn_router
+from routers.lawyer_router import lawyer_router
+from routers.metrics_router import metrics_router
 dotenv.load_dotenv(override=True)
 
 
-Base.metadata.create_all(bind=engine)
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # 启动时建表，关闭时释放数据库和 Redis 连接池
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+    await RedisService.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(JWTAuthMiddleware)
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +40,8 @@ app.add_middleware(
 app.include_router(user_router)
 app.include_router(ai_router)
 app.include_router(learn_router)
+app.include_router(lawyer_router)
+app.include_router(metrics_router)
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=True)
@@ -1,66 +1,66 @@
-import time
-
-from fastapi import Request
 from fastapi.responses import JSONResponse
 from jose import JWTError, jwt
-from starlette.middleware.base import BaseHTTPMiddleware
-import os
-import dotenv
-dotenv.load_dotenv()
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+from starlette.datastructures import Headers
+from security.jwt import verify_token
 
+# 无需鉴权的路径
+EXCLUDE_PATHS = frozenset([
+    "",
+    "/",
+    "/_ah/warmup",
+    "/auth/login",
+    "/docs",
+    "/openapi.json",
+    "/redoc",
+    "/favicon.ico",
+    "/user/register",
+    "/user/login",
+])
 
-class JWTAuthMiddleware(BaseHTTPMiddleware):
 
-    async def dispatch(self, request: Request, call_next):
-        path = request.url.path
+class JWTAuthMiddleware:
+    """
+    纯 ASGI 鉴权中间件：不包装请求和响应，流式响应和文件响应直接透传给客户端
+    """
 
-        EXCLUDE_PATHS = [
-            "",
-            "/",
-            "/_ah/warmup",
-            "/auth/login",
-            "/docs",
-            "/openapi.json",
-            "/redoc",
-            "/favicon.ico",
-            "/user/register",
-            "/user/login",
-        ]
+    def __init__(self, app):
+        self.app = app
 
-        # 忽略无需鉴权的路径
-        if path in EXCLUDE_PATHS:
-            return await call_next(request)
+    async def __call__(self, scope, receive, send):
+        # 忽略非 HTTP 请求和无需鉴权的路径
+        if scope["type"] != "http" or scope["path"] in EXCLUDE_PATHS:
+            await self.app(scope, receive, send)
+            return
 
         # 解析 Authorization 头
-        auth_header = request.headers.get("Authorization")
+        auth_header = Headers(scope=scope).get("Authorization")
         if auth_header and auth_header.startswith("Bearer "):
             token = auth_header.split(" ")[1]
             try:
-                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-                request.state.user = payload.get("user_id")
-                request.state.user_type = payload.get(
-                    "user_type"
-                )  # 使用 user_type 字段
-                # 检查token是否过期
-                if payload.get("exp") < time.time():
-                    return JSONResponse(
-                        status_code=401, content={"detail": "Token has expired"}
-                    )
+                # 签名和过期时间只在这里校验一次，claims 通过 request.state 交给路由依赖
+                payload = verify_token(token)
             except JWTError as e:
                 print(f"DEBUG: Middleware JWTError: {e}")
                 if isinstance(e, jwt.ExpiredSignatureError):
-                    return JSONResponse(
+                    response = JSONResponse(
                         status_code=401, content={"detail": "Token has expired"}
                     )
                 else:
-                    return JSONResponse(
+                    response = JSONResponse(
                         status_code=401, content={"detail": "Invalid token"}
                     )
+                await response(scope, receive, send)
+                return
         else:
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401, content={"detail": "Authorization header missing"}
             )
+            await response(scope, receive, send)
+            return
 
-        return await call_next(request)
+        # request.state 读写的就是 scope["state"]
+        state = scope.setdefault("state", {})
+        state["claims"] = payload
+        state["user"] = payload.get("user_id")
+        state["user_type"] = payload.get("user_type")  # 使用 user_type 字段
+        await self.app(scope, receive, send)
@@ -0,0 +1,51 @@
+"""
+创建 case_messages 表，并把 cases.history_conversation 中的 JSON 对话拆成逐条消息回填。
+已有消息的案件会被跳过，可重复执行。
+
+用法（在 backend 目录下）：python -m migrations.backfill_case_messages
+"""
+import asyncio
+import json
+from sqlalchemy import select, insert
+from database.db import engine, SessionLocal
+from models.case_model import Case
+from models.case_message_model import CaseMessage
+
+BATCH_SIZE = 200
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            lambda sync_conn: CaseMessage.__table__.create(bind=sync_conn, checkfirst=True))
+
+    async with SessionLocal() as db:
+        migrated = set((await db.scalars(select(CaseMessage.case_id).distinct())).all())
+        cases = await db.stream(select(Case.id, Case.history_conversation).filter(
+            Case.history_conversation.isnot(None)).execution_options(yield_per=BATCH_SIZE))
+
+        rows = []
+        count = 0
+        async for case_id, history_conversation in cases:
+            if case_id in migrated:
+                continue
+            history = json.loads(history_conversation or "[]")
+            rows.extend({
+                "case_id": case_id,
+                "seq": seq,
+                "role": message["role"],
+                "text": "".join(part.get("text", "") for part in message["parts"]),
+            } for seq, message in enumerate(history))
+            count += 1
+            if len(rows) >= BATCH_SIZE:
+                await db.execute(insert(CaseMessage), rows)
+                rows = []
+        if rows:
+            await db.execute(insert(CaseMessage), rows)
+        await db.commit()
+    await engine.dispose()
+    print(f"Backfilled case_messages for {count} cases")
+
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
@@ -0,0 +1,27 @@
+"""
+为 cases 表创建 case_list 分页使用的 (user_id, created_at, id) 复合索引。可重复执行。
+
+用法（在 backend 目录下）：python -m migrations.case_list_index
+"""
+import asyncio
+from sqlalchemy import inspect
+from database.db import engine
+from models.case_model import Case
+
+
+def _create_indexes(conn):
+    indexes = {index["name"] for index in inspect(conn).get_indexes("cases")}
+    for index in Case.__table__.indexes:
+        if index.name not in indexes:
+            index.create(bind=conn)
+            print(f"Created index {index.name}")
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_indexes)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
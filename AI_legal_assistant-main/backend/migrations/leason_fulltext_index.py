@@ -0,0 +1,30 @@
+"""
+为已存在的 leason 表创建 ngram 全文索引（仅 MySQL）。可重复执行。
+
+用法（在 backend 目录下）：python -m migrations.leason_fulltext_index
+"""
+import asyncio
+from sqlalchemy import inspect
+from database.db import engine
+from models.leason_model import Leason
+
+
+def _create_indexes(conn):
+    indexes = {index["name"] for index in inspect(conn).get_indexes("leason")}
+    for index in Leason.__table__.indexes:
+        if index.name not in indexes:
+            index.create(bind=conn)
+            print(f"Created index {index.name}")
+
+
+async def upgrade():
+    if engine.dialect.name != "mysql":
+        print("Full-text indexes are only created on MySQL, skipped")
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(_create_indexes)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
@@ -0,0 +1,68 @@
+"""
+给 laywer 表增加数值型价格/评分列和复合索引，创建 laywer_expertise 标签表，
+并从原有的 price / rating / expertise 字符串回填。可重复执行。
+
+用法（在 backend 目录下）：python -m migrations.typed_lawyer_attributes
+"""
+import asyncio
+from sqlalchemy import inspect, text, select, delete, insert, update
+from database.db import engine, SessionLocal
+from models.laywer_model import Laywer, LaywerExpertise
+from services.recommend_cache import RecommendCache
+from services.redis_service import RedisService
+from utils.lawyer_util import expertise_tags, parse_price_range, parse_rating
+
+BATCH_SIZE = 1000
+
+NEW_COLUMNS = {
+    "price_min": "NUMERIC(10, 2) NULL",
+    "price_max": "NUMERIC(10, 2) NULL",
+    "rating_value": "NUMERIC(3, 1) NOT NULL DEFAULT 0",
+}
+
+
+def _upgrade_schema(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("laywer")}
+    for name, ddl in NEW_COLUMNS.items():
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE laywer ADD COLUMN {name} {ddl}"))
+
+    LaywerExpertise.__table__.create(bind=conn, checkfirst=True)
+    indexes = {index["name"] for index in inspect(conn).get_indexes("laywer")}
+    for index in Laywer.__table__.indexes:
+        if index.name not in indexes:
+            index.create(bind=conn)
+
+
+async def upgrade():
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade_schema)
+
+    async with SessionLocal() as db:
+        rows = (await db.execute(
+            select(Laywer.id, Laywer.price, Laywer.rating, Laywer.expertise))).all()
+        await db.execute(delete(LaywerExpertise).execution_options(
+            synchronize_session=False))
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            values = []
+            tags = []
+            for lawyer_id, price, rating, expertise in batch:
+                price_min, price_max = parse_price_range(price)
+                values.append({"id": lawyer_id, "price_min": price_min,
+                               "price_max": price_max, "rating_value": parse_rating(rating)})
+                tags.extend({"tag": tag, "laywer_id": lawyer_id}
+                            for tag in expertise_tags(expertise))
+            await db.execute(update(Laywer), values)
+            if tags:
+                await db.execute(insert(LaywerExpertise), tags)
+        await db.commit()
+    await engine.dispose()
+    # 批量 UPDATE 不经过 ORM 变更事件，手动让推荐缓存和检索索引失效
+    await RecommendCache.bump_directory_version()
+    await RedisService.close()
+    print(f"Migrated {len(rows)} lawyers")
+
+
+if __name__ == "__main__":
+    asyncio.run(upgrade())
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy.sql import func
+from database.db import Base
+
+
+class CaseMessage(Base):
+    __tablename__ = "case_messages"
+    # (case_id, seq) 作为聚簇主键，按案件顺序读取消息只需一次范围扫描
+    case_id = Column(String(36), ForeignKey("cases.id", ondelete="CASCADE"),
+                     primary_key=True)
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    role = Column(String(16), nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def as_message(self):
+        return {"role": self.role, "parts": [{"text": self.text}]}
@@ -1,10 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, ForeignKey, Index
 from sqlalchemy.sql import func
+from sqlalchemy.orm import deferred
+from sqlalchemy.dialects import sqlite
 from database.db import Base
 from enum import Enum
 from sqlalchemy import Enum as SQLAlchemyEnum
 import uuid
-import json
+
+
+# SQLite 的 CURRENT_TIMESTAMP 只精确到秒，绑定参数也按同样格式存储，
+# 否则 case_list 游标中的时间与库中的字符串比较不一致
+SQLITE_TIMESTAMP = sqlite.DATETIME(
+    storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d")
+TIMESTAMP = DateTime(timezone=True).with_variant(SQLITE_TIMESTAMP, "sqlite")
 
 
 class CaseStatus(str, Enum):
@@ -16,6 +24,10 @@ class CaseStatus(str, Enum):
 
 class Case(Base):
     __tablename__ = "cases"
+    # case_list 按用户倒序分页，复合索引覆盖过滤、排序和游标比较
+    __table_args__ = (
+        Index("ix_cases_user_created", "user_id", "created_at", "id"),
+    )
     id = Column(String(36), primary_key=True, index=True,
                 default=lambda: str(uuid.uuid4()))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -26,23 +38,23 @@ class Case(Base):
     case_description = Column(Text, nullable=False)
     location = Column(String(100), nullable=True)
     prosecute_date = Column(DateTime, nullable=True)
-    history_conversation = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # 旧版整段 JSON 存储的对话记录，现改存 case_messages，仅保留用于回填
+    history_conversation = deferred(Column(Text, nullable=True))
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, onupdate=func.now())
 
     def as_dict(self):
         return {
             "id": self.id,
             "case_type": self.case_type,
             "status": self.status,
-            "case_description": self.case_description,
             "location": self.location,
             "prosecute_date": self.prosecute_date,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
 
-    def as_dict_detail(self):
+    def as_dict_detail(self, history):
         return {
             "id": self.id,
             "case_type": self.case_type,
@@ -50,7 +62,7 @@ class Case(Base):
             "case_description": self.case_description,
             "location": self.location,
             "prosecute_date": self.prosecute_date,
-            "history_conversation": json.loads(self.history_conversation),
+            "history_conversation": history,
             "created_at": self.created_at,
             "updated_at": self.updated_at
         }
@@ -1,11 +1,25 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Numeric, ForeignKey, Index
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from database.db import Base
 from datetime import datetime
+from utils.lawyer_util import expertise_tags, parse_price_range, parse_rating
+
+
+class LaywerExpertise(Base):
+    __tablename__ = "laywer_expertise"
+    # 标准化后的擅长领域标签，(tag, laywer_id) 主键即按领域筛选的索引
+    tag = Column(String(100), primary_key=True)
+    laywer_id = Column(Integer, ForeignKey("laywer.id", ondelete="CASCADE"),
+                       primary_key=True)
 
 
 class Laywer(Base):
     __tablename__ = "laywer"
+    __table_args__ = (
+        Index("ix_laywer_rating", "rating_value", "id"),
+        Index("ix_laywer_location_rating", "location", "rating_value", "id"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
     email = Column(String(255), nullable=False)
@@ -23,6 +37,32 @@ class Laywer(Base):
     law_firm = Column(String(255), nullable=False)
     # 律所地址
     firm_address = Column(String(255), nullable=False)
+    # 由 price / rating 字符串解析出的数值，用于排序和范围筛选
+    price_min = Column(Numeric(10, 2), nullable=True)
+    price_max = Column(Numeric(10, 2), nullable=True)
+    rating_value = Column(Numeric(3, 1), nullable=False, default=0)
+
+    expertise_tags = relationship(LaywerExpertise, cascade="all, delete-orphan",
+                                  passive_deletes=True)
+
+    @validates("expertise")
+    def _sync_expertise_tags(self, key, value):
+        self.expertise_tags = [LaywerExpertise(tag=tag)
+                               for tag in expertise_tags(value)]
+        return value
+
+    @validates("price")
+    def _sync_price_range(self, key, value):
+        self.price_min, self.price_max = parse_price_range(value)
+        return value
+
+    @validates("rating")
+    def _sync_rating_value(self, key, value):
+        self.rating_value = parse_rating(value)
+        return value
 
     def as_dict(self):
-        return {"id": self.id, "name": self.name, "email": self.email, "expertise": self.expertise, "price": self.price, "rating": self.rating, "introduction": self.introduction, "location": self.location, "law_firm": self.law_firm, "firm_address": self.firm_address}
+        return {"id": self.id, "name": self.name, "email": self.email, "expertise": self.expertise, "price": self.price, "rating": self.rating, "introduction": self.introduction, "location": self.location, "law_firm": self.law_firm, "firm_address": self.firm_address,
+                "price_min": float(self.price_min) if self.price_min is not None else None,
+                "price_max": float(self.price_max) if self.price_max is not None else None,
+                "rating_value": float(self.rating_value or 0)}
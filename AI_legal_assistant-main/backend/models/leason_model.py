@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from sqlalchemy.sql import func
 from database.db import Base
 from datetime import datetime
@@ -6,6 +6,13 @@ from datetime import datetime
 
 class Leason(Base):
     __tablename__ = "leason"
+    # ngram 全文索引只在 MySQL 上创建，用于课程搜索的相关度排序
+    __table_args__ = (
+        Index("ft_leason_text", "title", "leason_description", "leason_summary",
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram").ddl_if(dialect="mysql"),
+        Index("ft_leason_title", "title",
+              mysql_prefix="FULLTEXT", mysql_with_parser="ngram").ddl_if(dialect="mysql"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     video_url = Column(String(255), nullable=False)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Query
+from fastapi import Depends
+from typing import Optional
+from security.get_current_user import get_current_user
+from database.db import get_db
+from services.lawyer_service import LawyerService
+
+lawyer_router = APIRouter(prefix="/lawyer", tags=["Lawyer"])
+
+
+@lawyer_router.get("/search")
+async def lawyer_search(
+    expertise: Optional[str] = Query(None, description="Expertise tag, e.g. personal_injury"),
+    location: Optional[str] = Query(None, description="Lawyer location"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum rating"),
+    max_price: Optional[float] = Query(None, ge=0, description="Maximum starting price"),
+    limit: int = Query(20, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor for the next page"),
+    current_user=Depends(get_current_user),
+    db=Depends(get_db)
+):
+    return await LawyerService.search(expertise, location, min_rating, max_price, limit, cursor, db)
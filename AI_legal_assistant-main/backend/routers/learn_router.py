@@ -18,4 +18,4 @@ async def leason_list(
     current_user=Depends(get_current_user),
     db=Depends(get_db)
 ):
-    return LearnService.leason_list(page, limit, leason_type, search_text, current_user, db)
+    return await LearnService.leason_list(page, limit, leason_type, search_text, current_user, db)
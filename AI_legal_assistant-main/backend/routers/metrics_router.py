@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi import Depends
+from security.get_current_user import get_current_user
+from services.metrics_service import MetricsService
+
+metrics_router = APIRouter(prefix="/metrics", tags=["Metrics"])
+
+
+@metrics_router.get("")
+async def metrics(current_user=Depends(get_current_user)):
+    return await MetricsService.snapshot()
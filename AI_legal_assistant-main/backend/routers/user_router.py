@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 from fastapi import Request
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends
 from services.user_service import UserService
 from schemas.user_schema import UserRegisterRequest, UserLoginRequest
@@ -13,18 +13,18 @@ user_router = APIRouter(prefix="/user", tags=["User"])
 @user_router.post("/register")
 async def user_register(data: UserRegisterRequest,
                         request: Request,
-                        db: Session = Depends(get_db)):
-    return UserService.user_register(db, data)
+                        db: AsyncSession = Depends(get_db)):
+    return await UserService.user_register(db, data)
 
 
 @user_router.post("/login")
 async def user_login(data: UserLoginRequest,
                      request: Request,
-                     db: Session = Depends(get_db)):
-    return UserService.user_login(db, data)
+                     db: AsyncSession = Depends(get_db)):
+    return await UserService.user_login(db, data)
 
 
 @user_router.get("/info")
 async def user_info(current_user=Depends(get_current_user),
-                    db: Session = Depends(get_db)):
-    return UserService.user_info(db, current_user)
+                    db: AsyncSession = Depends(get_db)):
+    return await UserService.user_info(db, current_user)
@@ -1,19 +1,20 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import jwt, JWTError
-import os
-SECRET_KEY = os.getenv("SECRET_KEY")
-ALGORITHM = os.getenv("ALGORITHM")
+from jose import JWTError
+from security.jwt import verify_token
 
 security = HTTPBearer()
 
 
 def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ):
-    token = credentials.credentials
+    # 中间件已经验证过 token 时直接复用其 claims
+    claims = getattr(request.state, "claims", None)
+    if claims is not None:
+        return claims
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
+        return verify_token(credentials.credentials)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid token")
@@ -1,12 +1,22 @@
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Any, Dict, Union
+import threading
+import time
 
 from jose import jwt
 import os
+import dotenv
+dotenv.load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
+# 最近验证通过的 token 缓存条数
+VERIFIED_TOKEN_CACHE_SIZE = int(os.getenv("VERIFIED_TOKEN_CACHE_SIZE", "4096"))
+
+_verified_tokens = OrderedDict()
+_verified_tokens_lock = threading.Lock()
 
 
 def generate_token(
@@ -37,3 +47,39 @@ def generate_token(
 
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+
+def verify_token(token: str) -> Dict[str, Any]:
+    """
+    Verify a JWT token and return its claims.
+
+    Recently verified tokens are kept in a bounded LRU cache until their
+    `exp`, so repeated calls with the same token skip the HMAC check and
+    JSON decoding.
+
+    Args:
+        token: The encoded JWT token.
+
+    Returns:
+        Dict[str, Any]: The verified claims
+
+    Raises:
+        jwt.ExpiredSignatureError: If the token has expired.
+        JWTError: If the token is invalid.
+    """
+    now = time.time()
+    with _verified_tokens_lock:
+        claims = _verified_tokens.get(token)
+        if claims is not None:
+            if claims["exp"] > now:
+                _verified_tokens.move_to_end(token)
+                return claims
+            del _verified_tokens[token]
+
+    claims = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    if isinstance(claims.get("exp"), (int, float)):
+        with _verified_tokens_lock:
+            _verified_tokens[token] = claims
+            while len(_verified_tokens) > VERIFIED_TOKEN_CACHE_SIZE:
+                _verified_tokens.popitem(last=False)
+    return claims
@@ -1,40 +1,53 @@
 from google.genai import types  # 确保导入了 types
 from utils.generate_prompt import generate_prompt, generate_leason_prompt, generate_leason_question_prompt, generate_recommend_laywer_prompt
 import uuid
-from services.redis_service import RedisService
+from services.session_service import SessionService
+from services.context_service import ContextService
 from models.case_model import Case
+from models.case_message_model import CaseMessage
+from database.db import SessionLocal
 from fastapi.responses import JSONResponse
-from utils.ai_util import get_ai_response, ai_speech_to_text, ai_text_to_speech, ai_document_analysis
+from utils.ai_util import get_ai_response, stream_ai_response, stream_ai_speech, TTS_VOICE, TTS_MODEL
+from utils.audio_util import wav_header
 from schemas.ai_schema import AiChatRequest, AiInitModelRequest, AiLeasonInitModelRequest, AiLeasonChatRequest, AiLeasonQuestionRequest, AiRecommendLawyerRequest
 import json
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
-from fastapi import BackgroundTasks
-import os
-from fastapi.responses import FileResponse
-from utils.pdf_util import extract_text_from_pdf
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+from sqlalchemy import select, update, delete, func, insert, or_, and_
+from sqlalchemy.exc import IntegrityError
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+import anyio
+from utils.pdf_util import extract_pages_from_pdf, PdfError, PDF_MAX_BYTES
+from services.document_service import DocumentService
+from services.document_cache import DocumentCache
+from services.tts_cache import TtsCache
+from services.transcription_service import TranscriptionService, TranscriptionError, AUDIO_MAX_BYTES
 from models.leason_model import Leason
 from models.laywer_model import Laywer
+from services.lawyer_index import LawyerIndex
+from services.recommend_cache import RecommendCache
+from services.quiz_cache import QuizCache
+from utils.cursor_util import encode_cursor, decode_cursor, cursor_int, cursor_str, cursor_datetime
+
+# case_detail 默认返回的最新消息条数
+HISTORY_PAGE_SIZE = 20
+# 读取上传文件的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+TTS_HEADERS = {"Content-Disposition": 'attachment; filename="legal_assistant_reply.wav"'}
 
 
 class AiService:
     @staticmethod
-    def init_model(data: AiInitModelRequest, current_user, db):
+    async def init_model(data: AiInitModelRequest, current_user, db):
         session_id = str(uuid.uuid4())
         # 生成系统指令（System Prompt）
         system_prompt = generate_prompt(
             data.case_type, data.case_description, data.location, data.prosecute_date)
 
-        # 1. 初始化消息历史为空列表
-        # 我们不再把系统指令塞进 messages 数组，而是单独存储
-        init_messages = []
-
-        # 将 system_prompt 和 messages 分别存入 Redis
-        # 或者存成一个字典：{"system": system_prompt, "history": []}
-        RedisService.set(f"session:{session_id}", {
-            "system": system_prompt,
-            "history": init_messages
-        })
+        # 系统指令只存一次，消息历史之后按轮次追加
+        await SessionService.create(session_id, system_prompt)
 
         case = Case(user_id=current_user["user_id"],
                     case_type=data.case_type,
@@ -43,36 +56,28 @@ class AiService:
                     prosecute_date=data.prosecute_date,
                     )
         db.add(case)
-        db.commit()
-        db.refresh(case)
+        await db.commit()
+        await db.refresh(case)
         return JSONResponse({"session_id": session_id, "case_id": case.id})
 
     @staticmethod
-    def init_leason_model(data: AiLeasonInitModelRequest, current_user, db):
-        leason = db.query(Leason).filter(Leason.id == data.leason_id).first()
+    async def init_leason_model(data: AiLeasonInitModelRequest, current_user, db):
+        leason = await db.get(Leason, data.leason_id)
         session_id = str(uuid.uuid4())
         # 生成系统指令（System Prompt）
         system_prompt = generate_leason_prompt(
             leason.title, leason.leason_description, leason.leason_type, leason.leason_summary)
 
-        # 1. 初始化消息历史为空列表
-        # 我们不再把系统指令塞进 messages 数组，而是单独存储
-        init_messages = []
-
-        # 将 system_prompt 和 messages 分别存入 Redis
-        # 或者存成一个字典：{"system": system_prompt, "history": []}
-        RedisService.set(f"session:{session_id}", {
-            "system": system_prompt,
-            "history": init_messages
-        })
+        # 系统指令只存一次，消息历史之后按轮次追加
+        await SessionService.create(session_id, system_prompt)
         return JSONResponse({"session_id": session_id})
 
     @staticmethod
-    def chat(data: AiChatRequest, current_user, db):
-        # 2. 从 Redis 获取上下文数据
-        context = RedisService.get(f"session:{data.session_id}")
-        system_instruction = context.get("system")
-        history = context.get("history")
+    async def chat(data: AiChatRequest, current_user, db):
+        # 2. 从 Redis 获取系统指令、滚动摘要和未折叠的历史消息
+        system_prompt, summary, history = await SessionService.load(data.session_id)
+        if system_prompt is None:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
 
         # 3. 构造当前用户的新消息（注意必须是 parts 列表格式）
         new_user_message = {
@@ -81,36 +86,47 @@ class AiService:
         }
         history.append(new_user_message)
 
-        # 4. 调用 API，传入 system_instruction 和 history
-        # 这里的 get_ai_response 需要修改以接收 history 和 system_instruction
-        result_text = get_ai_response(history, system_instruction)
+        # 4. 按 token 预算裁剪上下文后调用 API
+        system_instruction, contents = await ContextService.build(
+            data.session_id, system_prompt, summary, history)
+        result_text = await get_ai_response(contents, system_instruction)
 
-        # 5. 将 AI 的回复存入历史（同样使用新格式）
+        # 5. 将 AI 的回复存入历史，并更新 Redis 和 数据库
+        await AiService._save_turn(data.session_id, history, result_text)
+        await AiService._save_case_history(
+            db, current_user["user_id"], data.case_id, history[-2:])
+
+        return JSONResponse({"message": result_text})
+
+    @staticmethod
+    async def chat_stream(data: AiChatRequest, current_user, db):
+        system_prompt, summary, history = await SessionService.load(data.session_id)
+        if system_prompt is None:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
         history.append({
-            "role": "model",
-            "parts": [{"text": result_text}]
+            "role": "user",
+            "parts": [{"text": data.prompt}]
         })
+        system_instruction, contents = await ContextService.build(
+            data.session_id, system_prompt, summary, history)
 
-        # 6. 更新 Redis 和 数据库
-        RedisService.set(f"session:{data.session_id}", {
-            "system": system_instruction,
-            "history": history
-        })
-        case = db.query(Case).filter(
-            Case.user_id == current_user["user_id"],
-            Case.id == data.case_id
-        ).first()
-        case.history_conversation = json.dumps(history)
-        db.commit()
+        async def on_finish(result_text):
+            await AiService._save_turn(data.session_id, history, result_text)
+            # 流结束时请求的 db 会话可能已被关闭，这里单独开一个
+            async with SessionLocal() as stream_db:
+                await AiService._save_case_history(
+                    stream_db, current_user["user_id"], data.case_id, history[-2:])
 
-        return JSONResponse({"message": result_text})
+        return StreamingResponse(
+            AiService._stream_events(contents, system_instruction, on_finish),
+            media_type="text/event-stream")
 
     @staticmethod
-    def leason_chat(data: AiLeasonChatRequest, current_user, db):
-        # 2. 从 Redis 获取上下文数据
-        context = RedisService.get(f"session:{data.session_id}")
-        system_instruction = context.get("system")
-        history = context.get("history")
+    async def leason_chat(data: AiLeasonChatRequest, current_user, db):
+        # 2. 从 Redis 获取系统指令、滚动摘要和未折叠的历史消息
+        system_prompt, summary, history = await SessionService.load(data.session_id)
+        if system_prompt is None:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
 
         # 3. 构造当前用户的新消息（注意必须是 parts 列表格式）
         new_user_message = {
@@ -119,35 +135,150 @@ class AiService:
         }
         history.append(new_user_message)
 
-        # 4. 调用 API，传入 system_instruction 和 history
-        # 这里的 get_ai_response 需要修改以接收 history 和 system_instruction
-        result_text = get_ai_response(history, system_instruction)
+        # 4. 按 token 预算裁剪上下文后调用 API
+        system_instruction, contents = await ContextService.build(
+            data.session_id, system_prompt, summary, history)
+        result_text = await get_ai_response(contents, system_instruction)
+
+        # 5. 将 AI 的回复存入历史，并更新 Redis
+        await AiService._save_turn(data.session_id, history, result_text)
+        return JSONResponse({"message": result_text})
 
-        # 5. 将 AI 的回复存入历史（同样使用新格式）
+    @staticmethod
+    async def leason_chat_stream(data: AiLeasonChatRequest, current_user, db):
+        system_prompt, summary, history = await SessionService.load(data.session_id)
+        if system_prompt is None:
+            return JSONResponse({"error": "Session not found"}, status_code=404)
+        history.append({
+            "role": "user",
+            "parts": [{"text": data.prompt}]
+        })
+        system_instruction, contents = await ContextService.build(
+            data.session_id, system_prompt, summary, history)
+
+        async def on_finish(result_text):
+            await AiService._save_turn(data.session_id, history, result_text)
+
+        return StreamingResponse(
+            AiService._stream_events(contents, system_instruction, on_finish),
+            media_type="text/event-stream")
+
+    @staticmethod
+    async def _stream_events(history, system_instruction, on_finish):
+        """
+        以 SSE 格式逐块推送模型回复；流正常结束或客户端断开时，
+        把已收到的完整回复交给 on_finish 持久化
+        """
+        chunks = []
+        try:
+            async for text in stream_ai_response(history, system_instruction):
+                chunks.append(text)
+                yield f"data: {json.dumps({'text': text})}\n\n"
+            yield "data: [DONE]\n\n"
+        finally:
+            # 客户端断开时任务会被取消，屏蔽取消以保证回复仍被保存
+            if chunks:
+                with anyio.CancelScope(shield=True):
+                    await on_finish("".join(chunks))
+
+    @staticmethod
+    async def _save_turn(session_id, history, result_text):
         history.append({
             "role": "model",
             "parts": [{"text": result_text}]
         })
+        # 只追加本轮的用户消息和模型回复
+        await SessionService.append(session_id, *history[-2:])
 
-        # 6. 更新 Redis 和 数据库
-        RedisService.set(f"session:{data.session_id}", {
-            "system": system_instruction,
-            "history": history
-        })
-        return JSONResponse({"message": result_text})
+    @staticmethod
+    async def _save_case_history(db, user_id, case_id, messages, retries=3):
+        """
+        每轮只向 case_messages 追加本轮消息，一条 INSERT 批量写入，
+        不再重写整个 history_conversation
+        """
+        for attempt in range(retries):
+            # 顺带校验案件归属并刷新更新时间
+            updated = await db.execute(update(Case).filter(
+                Case.user_id == user_id,
+                Case.id == case_id
+            ).values({Case.updated_at: func.now()}).execution_options(
+                synchronize_session=False))
+            if not updated.rowcount:
+                await db.rollback()
+                return
+            last_seq = await db.scalar(select(func.max(CaseMessage.seq)).filter(
+                CaseMessage.case_id == case_id))
+            next_seq = 0 if last_seq is None else last_seq + 1
+            try:
+                await db.execute(insert(CaseMessage), [
+                    {
+                        "case_id": case_id,
+                        "seq": next_seq + offset,
+                        "role": message["role"],
+                        "text": message["parts"][0]["text"],
+                    }
+                    for offset, message in enumerate(messages)
+                ])
+                await db.commit()
+                return
+            except IntegrityError:
+                # 同一案件的并发轮次抢到了相同的 seq，重新取号
+                await db.rollback()
+                if attempt == retries - 1:
+                    raise
 
     @staticmethod
-    def leason_question(data: AiLeasonQuestionRequest, current_user, db):
-        leason = db.query(Leason).filter(Leason.id == data.leason_id).first()
+    async def _case_history(db, case_id):
+        rows = (await db.scalars(select(CaseMessage).filter(
+            CaseMessage.case_id == case_id).order_by(CaseMessage.seq))).all()
+        return [row.as_message() for row in rows]
+
+    @staticmethod
+    async def _case_history_page(db, case_id, limit, cursor=None):
+        """
+        按 seq 倒序取最新的 limit 条消息（游标之前），返回正序的消息和更早一页的游标
+        """
+        query = select(CaseMessage.seq, CaseMessage.role, CaseMessage.text).filter(
+            CaseMessage.case_id == case_id)
+        if cursor:
+            position = decode_cursor(cursor, {"seq": cursor_int})
+            query = query.filter(CaseMessage.seq < position["seq"])
+        rows = (await db.execute(
+            query.order_by(CaseMessage.seq.desc()).limit(limit + 1))).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor({"seq": rows[-1].seq})
+        messages = [{"role": row.role, "parts": [{"text": row.text}]}
+                    for row in reversed(rows)]
+        return messages, next_cursor
+
+    @staticmethod
+    async def leason_question(data: AiLeasonQuestionRequest, current_user, db):
+        leason = await db.get(Leason, data.leason_id)
+        if not leason:
+            return JSONResponse({"error": "Leason not found"}, status_code=404)
+        # 题目只取决于课程内容，按 updated_at 版本缓存，不再每次打开都调用大模型
+        leason_data = leason.as_dict_detail()
+        try:
+            questions = await QuizCache.get(
+                leason.id, leason_data["updated_at"],
+                lambda: AiService._generate_quiz(leason_data))
+            return JSONResponse({"questions": questions})
+        except ValueError as e:
+            return JSONResponse({"message": str(e), "error": "JSON parse failed"})
+
+    @staticmethod
+    async def _generate_quiz(leason):
         system_prompt = generate_leason_question_prompt(
-            leason.title, leason.leason_description, leason.leason_type, leason.leason_summary)
+            leason["title"], leason["leason_description"], leason["leason_type"], leason["leason_summary"])
 
         # 对话必须以 user 角色开始，system 指令应通过 system_instruction 参数传递
         init_messages = [{
             "role": "user",
             "parts": [{"text": "Please generate the quiz questions based on the lesson content."}]
         }]
-        result_text = get_ai_response(init_messages, system_prompt)
+        result_text = await get_ai_response(init_messages, system_prompt)
 
         # 处理返回的字符串，提取并解析 JSON
         try:
@@ -159,73 +290,199 @@ class AiService:
                 clean_text = result_text.split(
                     "```")[1].split("```")[0].strip()
 
-            questions = json.loads(clean_text)
-            return JSONResponse({"questions": questions})
+            return json.loads(clean_text)
         except Exception as e:
             print(f"JSON Parse Error: {e}, Content: {result_text}")
-            return JSONResponse({"message": result_text, "error": "JSON parse failed"})
+            raise ValueError(result_text)
 
     @staticmethod
-    def case_list(db: Session, current_user):
-        cases = db.query(Case).filter(
-            Case.user_id == current_user["user_id"]).order_by(Case.created_at.desc()).all()
-        return [case.as_dict() for case in cases]
+    async def case_list(db: AsyncSession, current_user, limit=20, cursor=None):
+        # 只加载列表需要的列，case_description 等大文本列不会被读取
+        query = select(Case).options(load_only(
+            Case.id, Case.case_type, Case.status, Case.location,
+            Case.prosecute_date, Case.created_at, Case.updated_at
+        )).filter(Case.user_id == current_user["user_id"])
+        if cursor:
+            position = decode_cursor(cursor, {"created_at": cursor_datetime, "id": cursor_str})
+            query = query.filter(or_(
+                Case.created_at < position["created_at"],
+                and_(Case.created_at == position["created_at"], Case.id < position["id"])))
+        cases = (await db.scalars(query.order_by(
+            Case.created_at.desc(), Case.id.desc()).limit(limit + 1))).all()
+        next_cursor = None
+        if len(cases) > limit:
+            cases = cases[:limit]
+            next_cursor = encode_cursor({
+                "created_at": cases[-1].created_at.isoformat(), "id": cases[-1].id})
+        return {"cases": [case.as_dict() for case in cases], "next_cursor": next_cursor}
 
     @staticmethod
-    def case_delete(case_id: str, current_user, db):
-        case = db.query(Case).filter(
-            Case.user_id == current_user["user_id"], Case.id == case_id).first()
-        db.delete(case)
-        db.commit()
+    async def case_delete(case_id: str, current_user, db):
+        case = await db.scalar(select(Case).filter(
+            Case.user_id == current_user["user_id"], Case.id == case_id))
+        if not case:
+            return JSONResponse({"error": "Case not found"}, status_code=404)
+        # 先确认案件属于当前用户，再删除它的消息
+        await db.execute(delete(CaseMessage).filter(
+            CaseMessage.case_id == case_id).execution_options(synchronize_session=False))
+        await db.delete(case)
+        await db.commit()
         return JSONResponse({"message": "OK"})
 
     @staticmethod
-    def case_detail(case_id: str, current_user, db):
-        case = db.query(Case).filter(
-            Case.user_id == current_user["user_id"], Case.id == case_id).first()
-        return case.as_dict_detail()
+    async def case_detail(case_id: str, current_user, db, limit=HISTORY_PAGE_SIZE):
+        case = await db.scalar(select(Case).filter(
+            Case.user_id == current_user["user_id"], Case.id == case_id))
+        if not case:
+            return JSONResponse({"error": "Case not found"}, status_code=404)
+        # 只返回最新一页对话，更早的消息通过 case_history 按游标加载
+        history, next_cursor = await AiService._case_history_page(db, case_id, limit)
+        return {**case.as_dict_detail(history), "history_cursor": next_cursor}
+
+    @staticmethod
+    async def case_history(case_id: str, limit: int, cursor, current_user, db):
+        case = await db.scalar(select(Case.id).filter(
+            Case.user_id == current_user["user_id"], Case.id == case_id))
+        if not case:
+            return JSONResponse({"error": "Case not found"}, status_code=404)
+        messages, next_cursor = await AiService._case_history_page(
+            db, case_id, limit, cursor)
+        return {"messages": messages, "next_cursor": next_cursor}
 
     @staticmethod
     async def speech_to_text(file: UploadFile):
-        # Whisper requires a filename to identify the format
-        text = ai_speech_to_text(file.file)
+        data = await AiService._read_upload(file, AUDIO_MAX_BYTES)
+        if data is None:
+            return JSONResponse({"error": "File too large"}, status_code=413)
+        try:
+            text = await TranscriptionService.transcribe(data, file.content_type)
+        except TranscriptionError as e:
+            # 上游模型调用失败
+            return JSONResponse({"error": str(e)}, status_code=502)
+        if text is None:
+            return JSONResponse({"error": "Unsupported audio format"}, status_code=400)
         return JSONResponse({"text": text})
 
     @staticmethod
-    def text_to_speech(text: str, background_tasks: BackgroundTasks):
-        audio_file_path = ai_text_to_speech(text)
-
-        if not audio_file_path or not os.path.exists(audio_file_path):
+    async def text_to_speech(text: str):
+        # 相同文本、音色和模型的语音直接从缓存返回
+        cache_key = TtsCache.key(text, TTS_VOICE, TTS_MODEL)
+        cached = await TtsCache.get(cache_key)
+        if cached is not None:
+            return Response(wav_header(len(cached)) + cached,
+                            media_type="audio/wav", headers=TTS_HEADERS)
+
+        audio = stream_ai_speech(text, TTS_VOICE, TTS_MODEL)
+        # 先取到第一段音频再返回响应，合成失败时仍能返回错误
+        try:
+            first_chunk = await anext(audio, None)
+        except Exception as e:
+            print(f"TTS Error: {e}")
+            first_chunk = None
+        if first_chunk is None:
             return {"error": "Failed to generate audio"}
-        background_tasks.add_task(os.remove, audio_file_path)
-        # 2. 返回 FileResponse，并指定媒体类型为 audio/wav
-        return FileResponse(
-            path=audio_file_path,
+
+        async def wav_stream():
+            # WAV 头在内存中构造，PCM 边合成边推送，不落盘
+            yield wav_header()
+            yield first_chunk
+            chunks = [first_chunk]
+            try:
+                async for chunk in audio:
+                    chunks.append(chunk)
+                    yield chunk
+            except Exception as e:
+                print(f"TTS Error: {e}")
+                return
+            finally:
+                await audio.aclose()
+            # 只缓存完整合成的音频
+            await TtsCache.set(cache_key, b"".join(chunks))
+
+        return StreamingResponse(
+            wav_stream(),
             media_type="audio/wav",
-            filename="legal_assistant_reply.wav"
+            headers=TTS_HEADERS
         )
 
     @staticmethod
     async def document_analysis(file: UploadFile, current_user, db):
-        # 保存file到本地
-        file_path = f"pdfFiles/{file.filename}.pdf"
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
-        text = extract_text_from_pdf(file_path)
-        response = ai_document_analysis(text)
-        os.remove(file_path)
-        return JSONResponse({"text": response})
+        pages, digests, cached, error = await AiService._load_document(file)
+        if error:
+            return error
+        if cached is None:
+            # 长文档分块并发分析后再合并
+            cached = await DocumentService.analyze(pages)
+            await DocumentCache.set(*digests, cached)
+        return JSONResponse({"text": cached})
+
+    @staticmethod
+    async def document_analysis_stream(file: UploadFile, current_user, db):
+        pages, digests, cached, error = await AiService._load_document(file)
+        if error:
+            return error
+        if cached is not None:
+            events = DocumentService.result_stream(cached)
+        else:
+            async def on_result(result):
+                await DocumentCache.set(*digests, result)
+            events = DocumentService.analyze_stream(pages, on_result)
+        return StreamingResponse(events, media_type="text/event-stream")
 
     @staticmethod
-    def recommend_laywer(data: AiRecommendLawyerRequest, current_user, db):
-        case = db.query(Case).filter(
-            Case.user_id == current_user["user_id"], Case.id == data.case_id).first()
+    async def _load_document(file: UploadFile):
+        """
+        返回 (每页文本, (字节摘要, 文本摘要), 缓存的分析结果, 错误响应)。
+        同一文件命中缓存时不提取文本；文件过大或无法解析时只有错误响应
+        """
+        # 上传内容只保存在内存中，不再写入 pdfFiles 目录
+        data = await AiService._read_upload(file, PDF_MAX_BYTES)
+        if data is None:
+            return None, None, None, JSONResponse({"error": "File too large"}, status_code=413)
+        bytes_digest = DocumentCache.digest(data)
+        cached = await DocumentCache.get(bytes_digest)
+        if cached is not None:
+            return None, None, cached, None
+        try:
+            pages = await run_in_threadpool(extract_pages_from_pdf, data)
+        except PdfError as e:
+            return None, None, None, JSONResponse({"error": str(e)}, status_code=400)
+        # 文件不同但文本相同（例如重新导出的同一份合同）时按文本命中
+        text_digest = DocumentCache.text_digest(pages)
+        cached = await DocumentCache.get(bytes_digest, text_digest)
+        return pages, (bytes_digest, text_digest), cached, None
+
+    @staticmethod
+    async def _read_upload(file: UploadFile, max_bytes):
+        """
+        分块读取上传文件，超过 max_bytes 时立即停止并返回 None
+        """
+        if file.size is not None and file.size > max_bytes:
+            return None
+        buffer = bytearray()
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            buffer += chunk
+            if len(buffer) > max_bytes:
+                return None
+        return bytes(buffer)
+
+    @staticmethod
+    async def recommend_laywer(data: AiRecommendLawyerRequest, current_user, db):
+        case = await db.scalar(select(Case).filter(
+            Case.user_id == current_user["user_id"], Case.id == data.case_id))
         if not case:
             return JSONResponse({"error": "Case not found"}, status_code=404)
 
-        history = case.history_conversation
-        lawyers = db.query(Laywer).all()
-        lawyers = [lawyer.as_dict() for lawyer in lawyers]
+        # 案件内容和律师库都没变时直接返回缓存的推荐，不再调用大模型
+        cache_key, version, cached = await AiService._recommend_cache_lookup(db, case)
+        if cached:
+            return JSONResponse({"lawyer": cached})
+
+        history = json.dumps(await AiService._case_history(db, case.id))
+        # 先在本地索引中召回候选律师，只把前 K 名交给大模型
+        index = await LawyerIndex.get(db, version)
+        lawyers = await run_in_threadpool(
+            index.search, case.case_type, case.case_description, case.location)
         system_prompt = generate_recommend_laywer_prompt(
             lawyers, history, case.case_type, case.case_description, case.location, case.prosecute_date)
         init_messages = [
@@ -236,7 +493,7 @@ class AiService:
                 ]
             }
         ]
-        result_text = get_ai_response(init_messages, system_prompt)
+        result_text = await get_ai_response(init_messages, system_prompt)
 
         # 清理并解析 JSON 结果
         try:
@@ -254,15 +511,24 @@ class AiService:
             if not lawyer_id:
                 return JSONResponse({"error": "AI failed to return a valid lawyer ID", "raw_response": result_text}, status_code=500)
 
-            lawyer_obj = db.query(Laywer).filter(
-                Laywer.id == lawyer_id).first()
+            lawyer_obj = await db.scalar(select(Laywer).filter(Laywer.id == lawyer_id))
             if not lawyer_obj:
                 return JSONResponse({"error": f"Lawyer with ID {lawyer_id} not found in database"}, status_code=404)
 
-            return JSONResponse({"lawyer": lawyer_obj.as_dict()})
+            lawyer = lawyer_obj.as_dict()
+            await RecommendCache.set(cache_key, lawyer)
+            return JSONResponse({"lawyer": lawyer})
         except Exception as e:
             print(f"Failed to parse lawyer recommendation JSON: {e}")
             return JSONResponse({
                 "error": "Failed to parse AI response",
                 "raw_response": result_text
             }, status_code=500)
+
+    @staticmethod
+    async def _recommend_cache_lookup(db, case):
+        history_length = await db.scalar(select(func.count(CaseMessage.seq)).filter(
+            CaseMessage.case_id == case.id))
+        version = await RecommendCache.directory_version()
+        cache_key = RecommendCache.key(case, history_length, version)
+        return cache_key, version, await RecommendCache.get(cache_key)
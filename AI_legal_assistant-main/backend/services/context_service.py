@@ -0,0 +1,87 @@
+import os
+from services.session_service import SessionService
+from utils.ai_util import summarize_conversation
+
+# 每次调用模型时系统指令 + 摘要 + 最近消息的 token 预算
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "8000"))
+# 超出预算时折叠到预算的这个比例，避免之后每一轮都触发摘要
+CONTEXT_KEEP_RATIO = float(os.getenv("CONTEXT_KEEP_RATIO", "0.5"))
+# 每条消息的角色、分隔等固定开销
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text):
+    """
+    粗略估算 token 数：ASCII 约 4 个字符一个 token，中文等非 ASCII 字符按一个字一个 token
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+
+def estimate_message_tokens(message):
+    return MESSAGE_OVERHEAD_TOKENS + sum(
+        estimate_tokens(part.get("text")) for part in message["parts"])
+
+
+def compose_system_instruction(system_prompt, summary):
+    if not summary:
+        return system_prompt
+    return f"{system_prompt}\n\n### Summary of the earlier conversation\n{summary}"
+
+
+def split_history(history, budget):
+    """
+    从最新的消息往前取，返回 (需要折叠的旧消息, 预算内的最近消息)；
+    最近消息总是以 user 消息开头，且至少包含最后一条消息
+    """
+    used = 0
+    cut = len(history)
+    for index in range(len(history) - 1, -1, -1):
+        used += estimate_message_tokens(history[index])
+        if used > budget and index < len(history) - 1:
+            break
+        if history[index]["role"] == "user":
+            cut = index
+    return history[:cut], history[cut:]
+
+
+class ContextService:
+    @staticmethod
+    async def build(session_id, system_prompt, summary, history):
+        """
+        返回本轮调用模型的 (system_instruction, contents)。
+        history 为会话中未折叠的消息加上本轮的用户消息；超出预算时把较早的
+        轮次折叠进滚动摘要并写回会话，使每轮发送的 token 数保持稳定
+        """
+        fixed = estimate_tokens(compose_system_instruction(system_prompt, summary))
+        history_budget = max(CONTEXT_TOKEN_BUDGET - fixed, 0)
+        total = sum(estimate_message_tokens(message) for message in history)
+        if total <= history_budget:
+            return compose_system_instruction(system_prompt, summary), history
+
+        older, recent = split_history(
+            history, int(history_budget * CONTEXT_KEEP_RATIO))
+        if not older:
+            return compose_system_instruction(system_prompt, summary), recent
+
+        if await SessionService.acquire_fold_lock(session_id):
+            folded = False
+            try:
+                current = await SessionService.summary(session_id)
+                if current != summary:
+                    # 加载之后另一个请求已经折叠过，older 中的消息已被摘要，沿用它的摘要
+                    summary = current
+                else:
+                    new_summary = await summarize_conversation(summary, older)
+                    # older 只包含已存入 Redis 的消息，本轮用户消息一定在 recent 中
+                    folded = await SessionService.fold(
+                        session_id, new_summary, len(older), summary)
+                    summary = new_summary if folded else await SessionService.summary(session_id)
+            finally:
+                # 折叠成功时锁已在同一事务中释放
+                if not folded:
+                    await SessionService.release_fold_lock(session_id)
+        # 拿不到锁说明另一个请求正在折叠，本轮直接丢弃旧消息即可
+        return compose_system_instruction(system_prompt, summary), recent
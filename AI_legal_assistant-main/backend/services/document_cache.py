@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from services.redis_service import redis_client
+from services.metrics_service import MetricsService
+
+DOCUMENT_CACHE_TTL = int(os.getenv("DOCUMENT_CACHE_TTL", str(30 * 24 * 3600)))
+# 最多缓存的分析结果条数，超出时淘汰最久未访问的
+DOCUMENT_CACHE_MAX_ENTRIES = int(os.getenv("DOCUMENT_CACHE_MAX_ENTRIES", "2000"))
+# 按最近访问时间排序的有序集合，成员为文本摘要
+LRU_KEY = "document:lru"
+
+_whitespace = re.compile(r"\s+")
+
+
+def _analysis_key(text_digest):
+    return f"document:analysis:{text_digest}"
+
+
+def _bytes_key(bytes_digest):
+    return f"document:bytes:{bytes_digest}"
+
+
+class DocumentCache:
+    """
+    按内容寻址的文档分析缓存：分析结果以规范化文本的 SHA-256 为键，
+    文件字节的 SHA-256 指向文本摘要，同一文件再次上传时连文本提取都可以跳过
+    """
+
+    @staticmethod
+    def digest(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def text_digest(pages):
+        # 统一 Unicode 形式并压缩空白，重新导出、换行不同的同一份文本得到相同摘要
+        text = unicodedata.normalize("NFKC", "".join(pages))
+        return DocumentCache.digest(_whitespace.sub(" ", text).strip().encode("utf-8"))
+
+    @staticmethod
+    async def get(bytes_digest, text_digest=None):
+        """
+        只传 bytes_digest 时按文件字节查找；再传入 text_digest 时按规范化文本查找，
+        此时未命中记为一次 miss
+        """
+        level = "text_hit"
+        if text_digest is None:
+            level = "bytes_hit"
+            text_digest = await redis_client.get(_bytes_key(bytes_digest))
+            if text_digest is None:
+                return None
+            text_digest = text_digest.decode("utf-8")
+        cached = await redis_client.get(_analysis_key(text_digest))
+        if cached is None:
+            if level == "text_hit":
+                await MetricsService.incr("document_analysis", "miss")
+            return None
+        await DocumentCache._touch(bytes_digest, text_digest)
+        await MetricsService.incr("document_analysis", "hit")
+        await MetricsService.incr("document_analysis", level)
+        return json.loads(cached)
+
+    @staticmethod
+    async def set(bytes_digest, text_digest, analysis, ttl=DOCUMENT_CACHE_TTL):
+        # 模型调用失败时返回的是错误字典，不缓存
+        if not isinstance(analysis, str):
+            return
+        pipe = redis_client.pipeline()
+        pipe.set(_analysis_key(text_digest), json.dumps(analysis), ex=ttl)
+        pipe.set(_bytes_key(bytes_digest), text_digest, ex=ttl)
+        pipe.zadd(LRU_KEY, {text_digest: time.time()})
+        # 顺带清掉已经过期的条目
+        pipe.zremrangebyscore(LRU_KEY, "-inf", time.time() - ttl)
+        pipe.zcard(LRU_KEY)
+        size = (await pipe.execute())[-1]
+        if size > DOCUMENT_CACHE_MAX_ENTRIES:
+            await DocumentCache._evict(size - DOCUMENT_CACHE_MAX_ENTRIES)
+
+    @staticmethod
+    async def _touch(bytes_digest, text_digest, ttl=DOCUMENT_CACHE_TTL):
+        pipe = redis_client.pipeline()
+        pipe.zadd(LRU_KEY, {text_digest: time.time()})
+        pipe.expire(_analysis_key(text_digest), ttl)
+        pipe.set(_bytes_key(bytes_digest), text_digest, ex=ttl)
+        await pipe.execute()
+
+    @staticmethod
+    async def _evict(count):
+        victims = await redis_client.zpopmin(LRU_KEY, count)
+        if not victims:
+            return
+        # 字节摘要的指向键找不到分析结果即视为未命中，随 TTL 自然过期
+        await redis_client.delete(*[_analysis_key(member.decode("utf-8"))
+                                    for member, _ in victims])
+        await MetricsService.incr("document_analysis", "evicted", len(victims))
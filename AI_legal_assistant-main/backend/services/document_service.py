@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import re
+from contextlib import aclosing
+from services.context_service import estimate_tokens
+from utils.ai_util import ai_document_analysis, ai_document_chunk_analysis, ai_document_merge
+
+# 每个分块（以及每次合并的输入）的 token 预算
+DOCUMENT_CHUNK_TOKENS = int(os.getenv("DOCUMENT_CHUNK_TOKENS", "6000"))
+# 同时分析的分块数
+DOCUMENT_CHUNK_CONCURRENCY = int(os.getenv("DOCUMENT_CHUNK_CONCURRENCY", "4"))
+
+# 单页超出预算时依次尝试的切分点：章节/条款标题、空行、换行
+SPLIT_PATTERNS = (
+    re.compile(r"\n(?=[ \t]*(?:section|article|clause|schedule|chapter|part)\b"
+               r"|[ \t]*\d+(?:\.\d+)*[.)]?[ \t]+\S"
+               r"|[ \t]*第[一二三四五六七八九十百零\d]+[章节条])", re.IGNORECASE),
+    re.compile(r"\n[ \t]*\n"),
+    re.compile(r"\n"),
+)
+
+
+def split_text(text, budget, patterns=SPLIT_PATTERNS):
+    """
+    把超出预算的文本在最靠前的一级切分点处切开，仍超出的片段继续用下一级切分，
+    最后按字符数硬切
+    """
+    if estimate_tokens(text) <= budget:
+        yield text
+        return
+    if not patterns:
+        for start in range(0, len(text), budget):
+            yield text[start:start + budget]
+        return
+    cuts = [0, *(match.end() for match in patterns[0].finditer(text)
+                 if 0 < match.end() < len(text)), len(text)]
+    if len(cuts) == 2:
+        # 没有这一级的切分点，换下一级
+        yield from split_text(text, budget, patterns[1:])
+        return
+    for start, end in zip(cuts, cuts[1:]):
+        yield from split_text(text[start:end], budget, patterns)
+
+
+def chunk_pages(pages, budget=DOCUMENT_CHUNK_TOKENS):
+    """
+    按页顺序合并成不超过预算的分块，分块边界尽量落在页或章节的边界上
+    """
+    chunks = []
+    current = []
+    used = 0
+    for page in pages:
+        for piece in split_text(page, budget):
+            tokens = estimate_tokens(piece)
+            if current and used + tokens > budget:
+                chunks.append("".join(current))
+                current = []
+                used = 0
+            current.append(piece)
+            used += tokens
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _event(payload):
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+class DocumentService:
+    """
+    长文档按 map-reduce 分析：先并发分析各分块，再把各块结论合并成一份分析
+    """
+
+    @staticmethod
+    async def analyze(pages):
+        chunks = chunk_pages(pages)
+        if len(chunks) <= 1:
+            return await ai_document_analysis("".join(chunks))
+        try:
+            findings = [None] * len(chunks)
+            async with aclosing(DocumentService._map(chunks)) as results:
+                async for index, finding in results:
+                    findings[index] = finding
+            return await DocumentService._reduce(findings)
+        except Exception as e:
+            print(f"Document analysis error: {e}")
+            return {"error": str(e)}
+
+    @staticmethod
+    async def analyze_stream(pages, on_result=None):
+        """
+        以 SSE 格式推送分块数、每个分块的完成进度以及最终分析结果；
+        on_result 为可选的协程函数，在推送结果前接收分析结果
+        """
+        chunks = chunk_pages(pages)
+        yield _event({"stage": "chunked", "total": len(chunks)})
+        try:
+            if len(chunks) <= 1:
+                result = await ai_document_analysis("".join(chunks))
+            else:
+                findings = [None] * len(chunks)
+                done = 0
+                async with aclosing(DocumentService._map(chunks)) as results:
+                    async for index, finding in results:
+                        findings[index] = finding
+                        done += 1
+                        yield _event({"stage": "chunk", "index": index,
+                                      "done": done, "total": len(chunks)})
+                yield _event({"stage": "reduce"})
+                result = await DocumentService._reduce(findings)
+        except Exception as e:
+            print(f"Document analysis error: {e}")
+            result = {"error": str(e)}
+        if on_result is not None:
+            await on_result(result)
+        async for event in DocumentService.result_stream(result):
+            yield event
+
+    @staticmethod
+    async def result_stream(result):
+        yield _event({"stage": "result", "text": result})
+        yield "data: [DONE]\n\n"
+
+    @staticmethod
+    async def _map(chunks):
+        """
+        以有界并发分析各分块，按完成顺序产出 (分块序号, 结论)；
+        出错或调用方提前退出时取消其余分块
+        """
+        semaphore = asyncio.Semaphore(DOCUMENT_CHUNK_CONCURRENCY)
+
+        async def run(index, chunk):
+            async with semaphore:
+                return index, await ai_document_chunk_analysis(
+                    chunk, index + 1, len(chunks))
+
+        tasks = [asyncio.create_task(run(index, chunk))
+                 for index, chunk in enumerate(chunks)]
+        try:
+            for future in asyncio.as_completed(tasks):
+                yield await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    async def _reduce(findings):
+        # 各块结论合起来仍超出预算时，先分组合并，直到能一次合并为止
+        while len(findings) > 1:
+            groups = [[]]
+            used = 0
+            for finding in findings:
+                tokens = estimate_tokens(finding)
+                if groups[-1] and used + tokens > DOCUMENT_CHUNK_TOKENS:
+                    groups.append([])
+                    used = 0
+                groups[-1].append(finding)
+                used += tokens
+            if len(groups) == 1 or len(groups) == len(findings):
+                break
+            semaphore = asyncio.Semaphore(DOCUMENT_CHUNK_CONCURRENCY)
+
+            async def merge(group):
+                async with semaphore:
+                    return await ai_document_merge(group)
+
+            findings = await asyncio.gather(*[merge(group) for group in groups])
+        return await ai_document_merge(findings)
@@ -0,0 +1,131 @@
+import asyncio
+import os
+import time
+from collections import defaultdict
+import numpy as np
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from models.laywer_model import Laywer
+from utils.lawyer_util import tokenize, normalize_tag, expertise_tags
+
+# 索引重建间隔（秒）
+LAWYER_INDEX_TTL = int(os.getenv("LAWYER_INDEX_TTL", "300"))
+# 交给大模型做最终选择的候选律师数
+LAWYER_CANDIDATES_K = int(os.getenv("LAWYER_CANDIDATES_K", "10"))
+
+# 各项得分的权重
+EXPERTISE_WEIGHT = 3.0
+LOCATION_WEIGHT = 2.0
+RATING_WEIGHT = 1.0
+TEXT_WEIGHT = 2.0
+
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class LawyerIndex:
+    """
+    进程内的律师候选检索索引：按擅长领域、地区、评分以及介绍文本的 BM25
+    给律师打分，只把得分最高的若干名交给大模型
+    """
+
+    _instance = None
+    _lock = asyncio.Lock()
+
+    def __init__(self, lawyers):
+        self.lawyers = lawyers
+        self.built_at = time.monotonic()
+        self.version = None
+        count = len(lawyers)
+
+        self.expertise = [set(expertise_tags(lawyer["expertise"])) for lawyer in lawyers]
+        self.expertise_tokens = [set(tokenize(lawyer["expertise"])) for lawyer in lawyers]
+        self.locations = [set(tokenize(lawyer["location"])) for lawyer in lawyers]
+        self.ratings = np.array(
+            [lawyer["rating_value"] for lawyer in lawyers], dtype=np.float32)
+
+        # 倒排表：词 -> (文档下标数组, 词频数组)
+        postings = defaultdict(lambda: defaultdict(int))
+        lengths = np.zeros(count, dtype=np.float32)
+        for doc_id, lawyer in enumerate(lawyers):
+            tokens = tokenize(f"{lawyer['expertise']} {lawyer['introduction']}")
+            lengths[doc_id] = len(tokens)
+            for token in tokens:
+                postings[token][doc_id] += 1
+        self.postings = {
+            token: (np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+                    np.fromiter(docs.values(), dtype=np.float32, count=len(docs)))
+            for token, docs in postings.items()
+        }
+        self.idf = {
+            token: float(np.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5)))
+            for token, (docs, _) in self.postings.items()
+        }
+        average = lengths.mean() if count else 0.0
+        self.length_norm = BM25_K1 * (
+            1 - BM25_B + BM25_B * lengths / average) if average else lengths
+
+    @classmethod
+    async def get(cls, db, version=None):
+        """
+        返回当前索引；过期或律师库版本号变化时重新从数据库构建
+        """
+        index = cls._instance
+        if index is not None and not index._stale(version):
+            return index
+        async with cls._lock:
+            index = cls._instance
+            if index is None or index._stale(version):
+                lawyers = (await db.scalars(select(Laywer))).all()
+                # 构建倒排表是 CPU 密集操作，放到线程池中执行
+                index = await run_in_threadpool(
+                    cls, [lawyer.as_dict() for lawyer in lawyers])
+                index.version = version
+                cls._instance = index
+        return index
+
+    def _stale(self, version):
+        return (time.monotonic() - self.built_at >= LAWYER_INDEX_TTL
+                or (version is not None and version != self.version))
+
+    def _text_scores(self, text):
+        scores = np.zeros(len(self.lawyers), dtype=np.float32)
+        for token in set(tokenize(text)):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            docs, tf = posting
+            scores[docs] += self.idf[token] * tf * (BM25_K1 + 1) / (
+                tf + self.length_norm[docs])
+        return scores
+
+    def search(self, case_type, case_description, location, k=LAWYER_CANDIDATES_K):
+        if not self.lawyers:
+            return []
+        case_tag = normalize_tag(case_type)
+        case_tokens = set(tokenize(case_type))
+        expertise = np.array([
+            1.0 if case_tag in tags else
+            len(case_tokens & tokens) / max(len(case_tokens), 1)
+            for tags, tokens in zip(self.expertise, self.expertise_tokens)
+        ], dtype=np.float32)
+
+        location_tokens = set(tokenize(location))
+        location_scores = np.array([
+            len(location_tokens & tokens) / max(len(location_tokens), 1)
+            for tokens in self.locations
+        ], dtype=np.float32)
+
+        text = self._text_scores(f"{case_type} {case_description}")
+        if text.max() > 0:
+            text /= text.max()
+
+        scores = (EXPERTISE_WEIGHT * expertise
+                  + LOCATION_WEIGHT * location_scores
+                  + RATING_WEIGHT * self.ratings / 5.0
+                  + TEXT_WEIGHT * text)
+        k = min(k, len(self.lawyers))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.lawyers[i] for i in top]
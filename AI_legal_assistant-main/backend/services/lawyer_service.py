@@ -0,0 +1,41 @@
+from sqlalchemy import select, and_, or_
+from models.laywer_model import Laywer, LaywerExpertise
+from utils.cursor_util import encode_cursor, decode_cursor, cursor_int, cursor_decimal
+from utils.lawyer_util import normalize_tag
+
+
+class LawyerService:
+    @staticmethod
+    async def search(expertise, location, min_rating, max_price, limit, cursor, db):
+        """
+        按评分从高到低的键集分页：游标记录上一页最后一条的 (rating_value, id)，
+        翻页不需要 OFFSET 扫描
+        """
+        query = select(Laywer)
+        if expertise:
+            query = query.filter(Laywer.id.in_(
+                select(LaywerExpertise.laywer_id).filter(
+                    LaywerExpertise.tag == normalize_tag(expertise))))
+        if location:
+            query = query.filter(Laywer.location == location)
+        if min_rating is not None:
+            query = query.filter(Laywer.rating_value >= min_rating)
+        if max_price is not None:
+            query = query.filter(Laywer.price_min <= max_price)
+        if cursor:
+            position = decode_cursor(cursor, {"rating": cursor_decimal, "id": cursor_int})
+            query = query.filter(or_(
+                Laywer.rating_value < position["rating"],
+                and_(Laywer.rating_value == position["rating"], Laywer.id < position["id"])))
+
+        lawyers = (await db.scalars(query.order_by(
+            Laywer.rating_value.desc(), Laywer.id.desc()).limit(limit + 1))).all()
+        next_cursor = None
+        if len(lawyers) > limit:
+            lawyers = lawyers[:limit]
+            last = lawyers[-1]
+            next_cursor = encode_cursor({"rating": str(last.rating_value), "id": last.id})
+        return {
+            "lawyers": [lawyer.as_dict() for lawyer in lawyers],
+            "next_cursor": next_cursor,
+        }
@@ -1,24 +1,59 @@
 from models.leason_model import Leason
 from fastapi.responses import JSONResponse
+from sqlalchemy import select, func, or_, case
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import defer
+
+# 标题命中的相关度权重高于描述和摘要
+TITLE_WEIGHT = 2.0
 
 
 class LearnService:
     @staticmethod
-    def leason_list(page, limit, leason_type, search_text, current_user, db):
-        base_query = db.query(Leason)
+    async def leason_list(page, limit, leason_type, search_text, current_user, db):
+        # 总数通过窗口函数随分页结果一起返回，不再单独 COUNT 扫描一遍
+        total = func.count().over().label("total")
+        base_query = select(Leason, total).options(defer(Leason.leason_summary))
         if leason_type:
             base_query = base_query.filter(
                 Leason.leason_type == leason_type)
         if search_text:
-            base_query = base_query.filter(
-                Leason.title.contains(search_text))
-        leason_list = base_query.offset(
-            (page - 1) * limit).limit(limit).all()
-        leason_list = [leason.as_dict() for leason in leason_list]
-        total_count = base_query.count()
+            base_query = LearnService._search(base_query, search_text, db)
+        else:
+            base_query = base_query.order_by(Leason.id)
+        rows = (await db.execute(base_query.offset(
+            (page - 1) * limit).limit(limit))).all()
+        leason_list = [leason.as_dict() for leason, _ in rows]
+        if rows:
+            total_count = rows[0].total
+        elif page > 1:
+            # 页码超出范围时窗口函数没有行可返回，只有这种情况才单独计数
+            total_count = await db.scalar(base_query.order_by(None).with_only_columns(
+                func.count(), maintain_column_froms=True))
+        else:
+            total_count = 0
         return JSONResponse(content={
             "page": page,
             "limit": limit,
             "total": total_count,
             "leason_list": leason_list,
         })
+
+    @staticmethod
+    def _search(query, search_text, db):
+        if db.bind.dialect.name == "mysql":
+            # 使用 ngram 全文索引 ft_leason_text / ft_leason_title，按相关度排序
+            text_score = match(Leason.title, Leason.leason_description,
+                               Leason.leason_summary, against=search_text)
+            title_score = match(Leason.title, against=search_text)
+            return query.filter(text_score > 0).order_by(
+                (TITLE_WEIGHT * title_score + text_score).desc(), Leason.id)
+
+        # 其他数据库（本地开发）退化为 LIKE 匹配，标题命中的排在前面
+        pattern = f"%{search_text}%"
+        title_hit = Leason.title.like(pattern)
+        return query.filter(or_(
+            title_hit,
+            Leason.leason_description.like(pattern),
+            Leason.leason_summary.like(pattern),
+        )).order_by(case((title_hit, 0), else_=1), Leason.id)
@@ -0,0 +1,47 @@
+from services.redis_service import redis_client
+
+
+def _decode_counters(values):
+    return {field.decode("utf-8"): int(value) for field, value in values.items()}
+
+
+class MetricsService:
+    """
+    缓存命中等计数器存放在 Redis 哈希 metrics:{name} 中，多个 worker 共享；
+    队列深度等只对当前进程有意义的指标以回调方式注册
+    """
+
+    _process_gauges = {}
+
+    @staticmethod
+    async def incr(name, field, amount=1):
+        await redis_client.hincrby(f"metrics:{name}", field, amount)
+
+    @staticmethod
+    async def counters(name):
+        return _decode_counters(await redis_client.hgetall(f"metrics:{name}"))
+
+    @staticmethod
+    def register_gauge(name, callback):
+        MetricsService._process_gauges[name] = callback
+
+    @staticmethod
+    async def snapshot():
+        keys = [key async for key in redis_client.scan_iter(match="metrics:*")]
+        # 所有计数器哈希在一个管道中读取
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        counters = {}
+        for key, values in zip(keys, await pipe.execute()):
+            name = key.decode("utf-8").split(":", 1)[1]
+            stats = _decode_counters(values)
+            lookups = stats.get("hit", 0) + stats.get("miss", 0)
+            if lookups:
+                stats["hit_rate"] = round(stats.get("hit", 0) / lookups, 4)
+            counters[name] = stats
+        return {
+            "counters": counters,
+            "process": {name: callback()
+                        for name, callback in MetricsService._process_gauges.items()},
+        }
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from services.metrics_service import MetricsService
+from utils.encrypt_util import hash_password, check_password
+
+# bcrypt 专用线程数；bcrypt 计算时会释放 GIL，线程数不宜超过 CPU 核数
+PASSWORD_HASH_WORKERS = int(os.getenv(
+    "PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 排队加执行中的最大任务数，超出时直接返回 503，避免登录洪峰无限堆积
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+class PasswordService:
+    """
+    在独立的有界线程池中执行 bcrypt 哈希和校验，既不阻塞事件循环，
+    也不占用 starlette 处理其他同步调用的默认线程池
+    """
+
+    _executor = ThreadPoolExecutor(
+        max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+    _lock = threading.Lock()
+    _pending = 0
+    _running = 0
+    _rejected = 0
+
+    @staticmethod
+    async def hash(password):
+        return await PasswordService._submit(hash_password, password)
+
+    @staticmethod
+    async def verify(stored_password, provided_password):
+        return await PasswordService._submit(
+            check_password, stored_password, provided_password)
+
+    @staticmethod
+    async def _submit(func, *args):
+        with PasswordService._lock:
+            if PasswordService._pending >= PASSWORD_HASH_MAX_PENDING:
+                PasswordService._rejected += 1
+                raise HTTPException(
+                    status_code=503, detail="Server busy, please try again later")
+            PasswordService._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                PasswordService._executor, PasswordService._run, func, args)
+        finally:
+            with PasswordService._lock:
+                PasswordService._pending -= 1
+
+    @staticmethod
+    def _run(func, args):
+        with PasswordService._lock:
+            PasswordService._running += 1
+        try:
+            return func(*args)
+        finally:
+            with PasswordService._lock:
+                PasswordService._running -= 1
+
+    @staticmethod
+    def stats():
+        with PasswordService._lock:
+            return {
+                "workers": PASSWORD_HASH_WORKERS,
+                "running": PasswordService._running,
+                "queued": max(PasswordService._pending - PasswordService._running, 0),
+                "rejected": PasswordService._rejected,
+            }
+
+
+MetricsService.register_gauge("password_hash", PasswordService.stats)
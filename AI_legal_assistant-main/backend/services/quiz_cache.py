@@ -0,0 +1,119 @@
+import asyncio
+import json
+import os
+import uuid
+import redis
+from services.redis_service import redis_client
+from services.metrics_service import MetricsService
+
+QUIZ_CACHE_TTL = int(os.getenv("QUIZ_CACHE_TTL", str(7 * 24 * 3600)))
+# 生成锁的过期时间，也是等待其他 worker 生成结果的最长时间
+QUIZ_LOCK_TTL = 120
+QUIZ_POLL_INTERVAL = 0.5
+
+
+def _quiz_key(leason_id):
+    return f"quiz:{leason_id}"
+
+
+def _lock_key(leason_id):
+    return f"quiz:{leason_id}:lock"
+
+
+class QuizCache:
+    """
+    按课程缓存测验题，版本号为课程的 updated_at。
+    缺失时同一课程只生成一次：进程内共享同一个任务，跨 worker 用 Redis 锁；
+    过期的题目先照常返回，同时在后台重新生成
+    """
+
+    _inflight = {}
+
+    @staticmethod
+    async def get(leason_id, version, generate):
+        """
+        generate 为无参的协程函数，返回题目列表
+        """
+        cached = await redis_client.get(_quiz_key(leason_id))
+        entry = json.loads(cached) if cached else None
+        if entry and entry["version"] == version:
+            await MetricsService.incr("leason_quiz", "hit")
+            return entry["questions"]
+        if entry:
+            await MetricsService.incr("leason_quiz", "stale")
+            QuizCache._refresh(leason_id, version, generate)
+            return entry["questions"]
+        await MetricsService.incr("leason_quiz", "miss")
+        # shield：某个请求断开不会取消其他请求共享的生成任务
+        return await asyncio.shield(QuizCache._refresh(leason_id, version, generate))
+
+    @staticmethod
+    def _refresh(leason_id, version, generate):
+        task = QuizCache._inflight.get(leason_id)
+        if task is None:
+            task = asyncio.create_task(
+                QuizCache._generate(leason_id, version, generate))
+            QuizCache._inflight[leason_id] = task
+            task.add_done_callback(
+                lambda done: QuizCache._finish(leason_id, done))
+        return task
+
+    @staticmethod
+    def _finish(leason_id, task):
+        QuizCache._inflight.pop(leason_id, None)
+        # 后台刷新没有调用方等待，这里取走异常以免被当作未处理异常
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Quiz generation failed for leason {leason_id}: {task.exception()}")
+
+    @staticmethod
+    async def _generate(leason_id, version, generate):
+        # 锁的值是本任务独有的 token，释放时只删除自己持有的锁
+        token = uuid.uuid4().hex
+        while not await redis_client.set(
+                _lock_key(leason_id), token, nx=True, ex=QUIZ_LOCK_TTL):
+            # 其他 worker 正在生成，等待它写入缓存；锁被释放或过期仍没有结果时重新抢锁
+            questions = await QuizCache._wait_for(leason_id, version)
+            if questions is not None:
+                return questions
+        try:
+            questions = await generate()
+            await redis_client.set(
+                _quiz_key(leason_id),
+                json.dumps({"version": version, "questions": questions}),
+                ex=QUIZ_CACHE_TTL)
+            await MetricsService.incr("leason_quiz", "generated")
+            return questions
+        finally:
+            await QuizCache._release(leason_id, token)
+
+    @staticmethod
+    async def _release(leason_id, token):
+        """
+        锁仍是本任务设置的（生成超过锁的过期时间后可能已被其他 worker 重新持有）才删除
+        """
+        try:
+            async with redis_client.pipeline() as pipe:
+                await pipe.watch(_lock_key(leason_id))
+                current = await pipe.get(_lock_key(leason_id))
+                if current is None or current.decode("utf-8") != token:
+                    return
+                pipe.multi()
+                pipe.delete(_lock_key(leason_id))
+                await pipe.execute()
+        except redis.WatchError:
+            # 比较之后锁被改写，说明已不属于本任务
+            pass
+
+    @staticmethod
+    async def _wait_for(leason_id, version):
+        for _ in range(int(QUIZ_LOCK_TTL / QUIZ_POLL_INTERVAL)):
+            await asyncio.sleep(QUIZ_POLL_INTERVAL)
+            cached, locked = await redis_client.pipeline().get(
+                _quiz_key(leason_id)).exists(_lock_key(leason_id)).execute()
+            if cached:
+                entry = json.loads(cached)
+                if entry["version"] == version:
+                    return entry["questions"]
+            if not locked:
+                return None
+        return None
@@ -0,0 +1,77 @@
+import asyncio
+import hashlib
+import json
+import os
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from services.redis_service import redis_client
+from services.metrics_service import MetricsService
+from models.laywer_model import Laywer, LaywerExpertise
+
+RECOMMEND_CACHE_TTL = int(os.getenv("RECOMMEND_CACHE_TTL", "86400"))
+DIRECTORY_VERSION_KEY = "laywer:version"
+
+# 尚未完成的版本号递增任务，保留引用以免被垃圾回收
+_pending_bumps = set()
+
+
+class RecommendCache:
+    """
+    律师推荐结果缓存：键由案件内容哈希、对话条数和律师库版本号组成，
+    律师表一有变更版本号就递增，旧条目自然失效
+    """
+
+    @staticmethod
+    async def directory_version():
+        return int(await redis_client.get(DIRECTORY_VERSION_KEY) or 0)
+
+    @staticmethod
+    async def bump_directory_version():
+        return await redis_client.incr(DIRECTORY_VERSION_KEY)
+
+    @staticmethod
+    def key(case, history_length, version):
+        fingerprint = json.dumps([
+            case.case_type, case.case_description, case.location,
+            str(case.prosecute_date), history_length,
+        ])
+        digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+        return f"recommend:{version}:{digest}"
+
+    @staticmethod
+    async def get(key):
+        cached = await redis_client.get(key)
+        await MetricsService.incr("recommend_laywer", "hit" if cached else "miss")
+        return json.loads(cached) if cached else None
+
+    @staticmethod
+    async def set(key, lawyer, ttl=RECOMMEND_CACHE_TTL):
+        await redis_client.set(key, json.dumps(lawyer), ex=ttl)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_directory_change(session, flush_context):
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(instance, (Laywer, LaywerExpertise)):
+            session.info["laywer_changed"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_directory_version(session):
+    if session.info.pop("laywer_changed", False):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # 同步 Session（例如离线脚本）中没有事件循环，直接运行
+            asyncio.run(RecommendCache.bump_directory_version())
+            return
+        # 事件回调是同步的（AsyncSession 在事件循环线程里执行它），递增交给事件循环完成
+        task = loop.create_task(RecommendCache.bump_directory_version())
+        _pending_bumps.add(task)
+        task.add_done_callback(_pending_bumps.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_directory_change(session):
+    session.info.pop("laywer_changed", None)
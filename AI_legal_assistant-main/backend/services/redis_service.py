@@ -1,30 +1,239 @@
+import json
+import os
 import pickle
+import zlib
+import dotenv
 import redis
+import redis.asyncio
 
-redis_client = redis.Redis(
-    host='redis-14314.c326.us-east-1-3.ec2.cloud.redislabs.com',
-    port=14314,
-    password="WpQwPjYM55QHwQ3KpEDqoH6PS87Cyc4V",
-)
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+dotenv.load_dotenv()
+
+# 设置 REDIS_URL 时优先使用，其次按 REDIS_HOST、端口和密码连接，都未设置时连接本机 Redis；
+# 连接信息只从环境变量或 .env 读取，不在代码中写默认的主机和密码
+DEFAULT_REDIS_URL = "redis://localhost:6379/0"
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_HOST = os.getenv("REDIS_HOST")
+REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
+REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
+REDIS_DB = int(os.getenv("REDIS_DB", "0"))
+
+# 连接池配置
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# 连接池耗尽时等待空闲连接的秒数
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "5"))
+# 单条命令的读写超时
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+# 连接空闲超过该秒数后，使用前先 PING 一次
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+
+
+def _pool_options():
+    return {
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+    }
+
+
+if REDIS_HOST and not REDIS_URL:
+    redis_pool = redis.asyncio.BlockingConnectionPool(
+        host=REDIS_HOST, port=REDIS_PORT, password=REDIS_PASSWORD, db=REDIS_DB,
+        **_pool_options())
+else:
+    redis_pool = redis.asyncio.BlockingConnectionPool.from_url(
+        REDIS_URL or DEFAULT_REDIS_URL, **_pool_options())
+
+redis_client = redis.asyncio.Redis(connection_pool=redis_pool)
+
+# 写入时使用的序列化格式：msgpack 或 json，未安装 msgpack 时退回紧凑 JSON
+REDIS_SERIALIZER = os.getenv("REDIS_SERIALIZER", "msgpack" if msgpack else "json")
+# 写入时使用的压缩算法：zstd、zlib 或 none，未安装 zstandard 时退回 zlib
+REDIS_COMPRESSION = os.getenv("REDIS_COMPRESSION", "zstd" if zstandard else "zlib")
+# 序列化后超过该字节数才压缩，短消息压缩得不偿失
+REDIS_COMPRESS_THRESHOLD = int(os.getenv("REDIS_COMPRESS_THRESHOLD", "1024"))
+# 是否还读取旧版本 pickle 的值（读出后改写为新格式）
+REDIS_PICKLE_FALLBACK = os.getenv("REDIS_PICKLE_FALLBACK", "1") == "1"
+
+# 编码后首字节：低 4 位为序列化格式，高 4 位为压缩算法；
+# 都是不可打印字符，与旧的 pickle（0x80 开头）和明文 JSON 区分开
+JSON = 0x01
+MSGPACK = 0x02
+ZLIB = 0x10
+ZSTD = 0x20
+PICKLE_PROTOCOL_MARK = 0x80
+CODEC_FLAGS = {serializer | compression
+               for serializer in (JSON, MSGPACK) for compression in (0, ZLIB, ZSTD)}
+
+
+def _json_dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _zlib_compress(data):
+    # 最低压缩级别：体积与默认级别相近，编码快数倍
+    return zlib.compress(data, 1)
+
+
+def _zstd_compress(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data):
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+SERIALIZERS = {
+    "json": (JSON, _json_dumps, json.loads),
+}
+if msgpack:
+    SERIALIZERS["msgpack"] = (MSGPACK, msgpack.packb, msgpack.unpackb)
+
+COMPRESSORS = {
+    "none": (0, None, None),
+    "zlib": (ZLIB, _zlib_compress, zlib.decompress),
+}
+if zstandard:
+    COMPRESSORS["zstd"] = (ZSTD, _zstd_compress, _zstd_decompress)
+
+
+def _find(registry, flag):
+    for registered_flag, _, decode in registry.values():
+        if registered_flag == flag:
+            return decode
+    return None
+
+
+class CodecError(ValueError):
+    """
+    Redis 中的值无法解码
+    """
+
+
+class RedisCodec:
+    """
+    Redis 值的编解码：JSON 形态的数据用 msgpack（或紧凑 JSON）序列化，
+    超过阈值再压缩，首字节记录所用格式，读取时按首字节解码
+    """
+
+    @staticmethod
+    def encode(value, serializer=None, compression=None, threshold=None):
+        flag, dumps, _ = SERIALIZERS[serializer or REDIS_SERIALIZER]
+        data = dumps(value)
+        limit = REDIS_COMPRESS_THRESHOLD if threshold is None else threshold
+        if len(data) > limit:
+            compress_flag, compress, _ = COMPRESSORS[compression or REDIS_COMPRESSION]
+            if compress is not None:
+                packed = compress(data)
+                # 压缩后没有变小就存原文
+                if len(packed) < len(data):
+                    flag |= compress_flag
+                    data = packed
+        return bytes([flag]) + data
+
+    @staticmethod
+    def is_legacy(data):
+        return not data or data[0] not in CODEC_FLAGS
+
+    @staticmethod
+    def decode(data):
+        """
+        兼容旧格式：pickle 的值（开启 REDIS_PICKLE_FALLBACK 时）和不带首字节的明文 JSON
+        """
+        if not data:
+            return None
+        flag = data[0]
+        if flag == PICKLE_PROTOCOL_MARK:
+            if not REDIS_PICKLE_FALLBACK:
+                raise CodecError("Pickled values are disabled")
+            return pickle.loads(data)
+        if flag not in CODEC_FLAGS:
+            return json.loads(data)
+        decompress = _find(COMPRESSORS, flag & 0xF0)
+        loads = _find(SERIALIZERS, flag & 0x0F)
+        if loads is None or (flag & 0xF0 and decompress is None):
+            # 由装有 msgpack/zstandard 的实例写入，本实例缺少对应依赖
+            raise CodecError(f"Unsupported codec flag {flag:#04x}")
+        body = data[1:]
+        if decompress is not None:
+            body = decompress(body)
+        return loads(body)
 
 
 class RedisService:
+    """
+    基于 redis.asyncio 连接池的异步读写，值经 RedisCodec 编解码；
+    mget/mset 把多个键合并成一次往返
+    """
 
     @staticmethod
-    def get(key):
-        try:
-            data = redis_client.get(key)
-            return pickle.loads(data) if data else None
-        except Exception as e:
-            raise e
+    async def get(key):
+        data = await redis_client.get(key)
+        if not data:
+            return None
+        value = RedisCodec.decode(data)
+        if RedisCodec.is_legacy(data):
+            await RedisService._migrate(key, data, value)
+        return value
+
+    @staticmethod
+    async def set(key, value, ttl=7200, keepttl=False):
+        value = RedisCodec.encode(value)
+        if keepttl:
+            await redis_client.set(key, value, keepttl=keepttl)
+        else:
+            await redis_client.set(key, value, ttl)
+
+    @staticmethod
+    async def mget(keys):
+        """
+        一次 MGET 读取多个键，按 keys 的顺序返回解码后的值，不存在的键为 None
+        """
+        if not keys:
+            return []
+        values = await redis_client.mget(keys)
+        return [RedisCodec.decode(data) if data else None for data in values]
+
+    @staticmethod
+    async def mset(mapping, ttl=7200):
+        """
+        在一个非事务管道中写入多个键并设置过期时间，只有一次往返
+        """
+        if not mapping:
+            return
+        pipe = redis_client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(key, RedisCodec.encode(value), ex=ttl)
+        await pipe.execute()
+
+    @staticmethod
+    async def close():
+        await redis_client.aclose()
+        await redis_pool.disconnect()
 
     @staticmethod
-    def set(key, value, ttl=7200, keepttl=False):
+    async def _migrate(key, data, value):
+        # 旧格式的值读出后原地改写为新格式并保留过期时间；期间被其他请求改写则放弃
         try:
-            value = pickle.dumps(value)
-            if keepttl:
-                redis_client.set(key, value, keepttl=keepttl)
-            else:
-                redis_client.set(key, value, ttl)
-        except Exception as e:
-            raise e
+            async with redis_client.pipeline() as pipe:
+                await pipe.watch(key)
+                if await pipe.get(key) != data:
+                    return
+                pipe.multi()
+                pipe.set(key, RedisCodec.encode(value), keepttl=True)
+                await pipe.execute()
+        except (redis.WatchError, TypeError, ValueError):
+            # 无法用新格式表示的值（非 JSON 形态）保持原样
+            pass
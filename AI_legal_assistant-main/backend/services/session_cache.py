@@ -0,0 +1,88 @@
+import os
+from collections import OrderedDict
+from services.metrics_service import MetricsService
+
+# 每个 worker 在内存中保留的会话数
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "1000"))
+
+
+class SessionCache:
+    """
+    进程内的热点会话 LRU，每个条目记录会话在 Redis 中的版本号。
+    会话每次写入都会递增版本号，读取时只比较版本号，一致才使用本地副本，
+    因此其他 worker 的写入不会读到旧数据；只在事件循环线程中访问，不需要加锁
+    """
+
+    _entries = OrderedDict()
+    _hits = 0
+    _stale = 0
+    _misses = 0
+
+    @staticmethod
+    def version(session_id):
+        """
+        本地副本的版本号，没有副本时返回 None 并记为一次 miss
+        """
+        entry = SessionCache._entries.get(session_id)
+        if entry is None:
+            SessionCache._misses += 1
+            return None
+        return entry["version"]
+
+    @staticmethod
+    def get(session_id, version):
+        """
+        version 为 Redis 中当前的版本号；与本地副本不一致时丢弃副本并返回 None
+        """
+        entry = SessionCache._entries.get(session_id)
+        if entry is None:
+            return None
+        if version is None or int(version) != entry["version"]:
+            SessionCache._entries.pop(session_id, None)
+            SessionCache._stale += 1
+            return None
+        SessionCache._entries.move_to_end(session_id)
+        SessionCache._hits += 1
+        return entry
+
+    @staticmethod
+    def put(session_id, version, system_prompt, summary, history):
+        SessionCache._entries[session_id] = {
+            "version": int(version),
+            "system": system_prompt,
+            "summary": summary,
+            "history": history,
+        }
+        SessionCache._entries.move_to_end(session_id)
+        while len(SessionCache._entries) > SESSION_CACHE_MAX_ENTRIES:
+            SessionCache._entries.popitem(last=False)
+
+    @staticmethod
+    def advance(session_id, version, apply):
+        """
+        本进程刚把会话写成 version 版：本地副本正好是上一版时用 apply 就地更新，
+        中间夹着其他 worker 的写入时丢弃副本
+        """
+        entry = SessionCache._entries.get(session_id)
+        if entry is None:
+            return
+        if entry["version"] != version - 1:
+            SessionCache._entries.pop(session_id, None)
+            return
+        apply(entry)
+        entry["version"] = version
+
+    @staticmethod
+    def stats():
+        lookups = SessionCache._hits + SessionCache._stale + SessionCache._misses
+        return {
+            "entries": len(SessionCache._entries),
+            "max_entries": SESSION_CACHE_MAX_ENTRIES,
+            "hit": SessionCache._hits,
+            "stale": SessionCache._stale,
+            "miss": SessionCache._misses,
+            "hit_rate": round(SessionCache._hits / lookups, 4) if lookups else None,
+        }
+
+
+MetricsService.register_gauge("session_cache", SessionCache.stats)
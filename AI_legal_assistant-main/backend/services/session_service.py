@@ -0,0 +1,156 @@
+import redis
+from services.redis_service import redis_client, RedisCodec, RedisService
+from services.session_cache import SessionCache
+
+SESSION_TTL = 7200
+
+
+def _system_key(session_id):
+    return f"session:{session_id}:system"
+
+
+def _history_key(session_id):
+    return f"session:{session_id}:history"
+
+
+def _summary_key(session_id):
+    return f"session:{session_id}:summary"
+
+
+def _fold_lock_key(session_id):
+    return f"session:{session_id}:fold_lock"
+
+
+def _version_key(session_id):
+    return f"session:{session_id}:version"
+
+
+class SessionService:
+    """
+    对话会话存储：系统指令只写一次，每轮消息经 RedisCodec 编码后追加到 Redis 列表，
+    不再整体读出-修改-写回整个会话；旧的明文 JSON 消息读取时照常解码。
+    每次写入在同一事务中递增 session:{id}:version，供 SessionCache 校验本地副本
+    """
+
+    @staticmethod
+    async def create(session_id, system_prompt, ttl=SESSION_TTL):
+        pipe = redis_client.pipeline()
+        pipe.set(_system_key(session_id), system_prompt, ex=ttl)
+        pipe.delete(_history_key(session_id))
+        pipe.incr(_version_key(session_id))
+        pipe.expire(_version_key(session_id), ttl)
+        version = (await pipe.execute())[2]
+        SessionCache.put(session_id, version, system_prompt, None, [])
+
+    @staticmethod
+    async def load(session_id, start=0):
+        """
+        读取系统指令、滚动摘要和从 start 开始的历史消息，已折叠进摘要的旧消息不在列表中。
+        本地有副本时只取一次版本号，一致就直接用副本；否则一次往返读取整个会话
+        """
+        if SessionCache.version(session_id) is not None:
+            entry = SessionCache.get(session_id, await redis_client.get(_version_key(session_id)))
+            if entry is not None:
+                return entry["system"], entry["summary"], entry["history"][start:]
+
+        pipe = redis_client.pipeline()
+        pipe.get(_system_key(session_id))
+        pipe.get(_summary_key(session_id))
+        pipe.lrange(_history_key(session_id), start, -1)
+        pipe.get(_version_key(session_id))
+        system_prompt, summary, messages, version = await pipe.execute()
+        if system_prompt is None:
+            return await SessionService._migrate_legacy(session_id, start)
+        system_prompt = system_prompt.decode("utf-8")
+        summary = summary.decode("utf-8") if summary else None
+        history = [RedisCodec.decode(m) for m in messages]
+        # 只缓存完整的历史；旧会话还没有版本号，等下一次写入后再缓存
+        if start == 0 and version is not None:
+            SessionCache.put(session_id, version, system_prompt, summary, history)
+        # 返回副本，调用方会往列表里追加本轮消息
+        return system_prompt, summary, list(history)
+
+    @staticmethod
+    async def append(session_id, *messages, ttl=SESSION_TTL):
+        """
+        一次往返追加消息并刷新过期时间，返回追加后的历史长度
+        """
+        pipe = redis_client.pipeline()
+        pipe.rpush(_history_key(session_id),
+                   *[RedisCodec.encode(message) for message in messages])
+        pipe.expire(_history_key(session_id), ttl)
+        pipe.expire(_system_key(session_id), ttl)
+        pipe.expire(_summary_key(session_id), ttl)
+        pipe.incr(_version_key(session_id))
+        pipe.expire(_version_key(session_id), ttl)
+        length, *_, version, _ = await pipe.execute()
+        SessionCache.advance(session_id, version,
+                             lambda entry: entry["history"].extend(messages))
+        return length
+
+    @staticmethod
+    async def acquire_fold_lock(session_id, timeout=60):
+        # 同一会话同时只允许一个请求折叠历史，避免重复裁剪
+        return bool(await redis_client.set(_fold_lock_key(session_id), 1, nx=True, ex=timeout))
+
+    @staticmethod
+    async def release_fold_lock(session_id):
+        await redis_client.delete(_fold_lock_key(session_id))
+
+    @staticmethod
+    async def summary(session_id):
+        summary = await redis_client.get(_summary_key(session_id))
+        return summary.decode("utf-8") if summary else None
+
+    @staticmethod
+    async def fold(session_id, summary, count, previous_summary, ttl=SESSION_TTL):
+        """
+        保存新的滚动摘要，并从列表头部移除已被摘要的 count 条消息；
+        LTRIM 只裁剪头部，不影响并发追加到尾部的消息。
+        count 是按加载时的列表计算的，只有摘要仍是加载时的 previous_summary
+        （期间没有其他请求折叠过）才写入，否则会裁掉没有被摘要的消息；返回是否写入
+        """
+        try:
+            async with redis_client.pipeline() as pipe:
+                await pipe.watch(_summary_key(session_id))
+                current = await pipe.get(_summary_key(session_id))
+                if (current.decode("utf-8") if current else None) != previous_summary:
+                    return False
+                pipe.multi()
+                pipe.set(_summary_key(session_id), summary, ex=ttl)
+                pipe.ltrim(_history_key(session_id), count, -1)
+                pipe.delete(_fold_lock_key(session_id))
+                pipe.incr(_version_key(session_id))
+                pipe.expire(_version_key(session_id), ttl)
+                *_, version, _ = await pipe.execute()
+        except redis.WatchError:
+            # 检查之后摘要又被改写
+            return False
+
+        def apply(entry):
+            entry["summary"] = summary
+            del entry["history"][:count]
+
+        SessionCache.advance(session_id, version, apply)
+        return True
+
+    @staticmethod
+    async def _migrate_legacy(session_id, start):
+        # 旧版本把 {"system", "history"} 整体 pickle 在 session:{id} 下；经 RedisService.get 读取，
+        # 旧值先原地改写为新格式，拆分中途失败也不会留下 pickle 值
+        context = await RedisService.get(f"session:{session_id}")
+        if context is None:
+            return None, None, None
+        history = context.get("history") or []
+        pipe = redis_client.pipeline()
+        pipe.set(_system_key(session_id), context.get("system"), ex=SESSION_TTL)
+        pipe.delete(_history_key(session_id))
+        if history:
+            pipe.rpush(_history_key(session_id),
+                       *[RedisCodec.encode(message) for message in history])
+            pipe.expire(_history_key(session_id), SESSION_TTL)
+        pipe.delete(f"session:{session_id}")
+        pipe.incr(_version_key(session_id))
+        pipe.expire(_version_key(session_id), SESSION_TTL)
+        await pipe.execute()
+        return context.get("system"), None, history[start:]
@@ -0,0 +1,106 @@
+import asyncio
+import os
+import re
+from utils.ai_util import ai_speech_to_text
+from utils.audio_util import AudioError, sniff_audio_mime, split_wav
+
+# 语音上传的大小上限（字节）
+AUDIO_MAX_BYTES = int(os.getenv("AUDIO_MAX_BYTES", str(25 * 1024 * 1024)))
+# WAV 录音按该时长切段，相邻片段重叠若干秒，避免切断词句
+TRANSCRIBE_SEGMENT_SECONDS = float(os.getenv("TRANSCRIBE_SEGMENT_SECONDS", "60"))
+TRANSCRIBE_OVERLAP_SECONDS = float(os.getenv("TRANSCRIBE_OVERLAP_SECONDS", "2"))
+# 同时转写的片段数
+TRANSCRIBE_CONCURRENCY = int(os.getenv("TRANSCRIBE_CONCURRENCY", "4"))
+# 拼接时在相邻片段首尾查找重复内容的最大词数
+STITCH_MAX_OVERLAP_WORDS = int(os.getenv("STITCH_MAX_OVERLAP_WORDS", "30"))
+
+# 中日韩字符逐字比较，其余按空白分词
+_CJK = "\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff"
+_cjk = re.compile(f"[{_CJK}]")
+_token = re.compile(f"[{_CJK}]|[^\\s{_CJK}]+")
+_punctuation = re.compile(r"[^\w]+")
+
+
+class TranscriptionError(RuntimeError):
+    """
+    转写服务调用失败
+    """
+
+
+def _normalize(token):
+    return _punctuation.sub("", token).lower()
+
+
+def stitch_transcripts(texts, max_overlap=STITCH_MAX_OVERLAP_WORDS):
+    """
+    按顺序拼接各片段的转写结果，去掉相邻片段因重叠录音而重复的开头
+    """
+    result = ""
+    for text in texts:
+        text = text.strip()
+        if not text:
+            continue
+        if not result:
+            result = text
+            continue
+        tail = [_normalize(match.group()) for match in _token.finditer(result)][-max_overlap:]
+        head = list(_token.finditer(text))[:max_overlap]
+        words = [_normalize(match.group()) for match in head]
+        # 取上一段结尾与这一段开头重合的最长词序列
+        skip = 0
+        for size in range(min(len(tail), len(words)), 0, -1):
+            if tail[-size:] == words[:size] and any(words[:size]):
+                skip = head[size - 1].end()
+                break
+        text = text[skip:].lstrip()
+        if text:
+            # 中日韩文字之间不加空格
+            separator = "" if _cjk.match(result[-1]) and _cjk.match(text[0]) else " "
+            result += separator + text
+    return result
+
+
+class TranscriptionService:
+    """
+    语音转写：识别真实的音频格式，长 WAV 录音切成重叠片段后有界并发转写，再按顺序拼接
+    """
+
+    @staticmethod
+    async def transcribe(data, declared_type=None, transcriber=ai_speech_to_text):
+        """
+        transcriber 为 (音频字节, mime 类型) -> 文本 的协程函数，默认调用 Gemini，可替换为本地实现；
+        格式无法识别时返回 None，转写失败时抛出 TranscriptionError
+        """
+        mime_type = sniff_audio_mime(data)
+        if mime_type is None:
+            # 识别不出的格式只接受客户端声明的音频类型
+            if not declared_type or not declared_type.startswith("audio/"):
+                return None
+            mime_type = declared_type
+        segments = [data]
+        if mime_type == "audio/wav":
+            try:
+                segments = split_wav(data, TRANSCRIBE_SEGMENT_SECONDS, TRANSCRIBE_OVERLAP_SECONDS)
+            except AudioError as e:
+                # 非 PCM 编码的 WAV 无法按帧切分，整段交给模型
+                print(f"WAV split skipped: {e}")
+        try:
+            if len(segments) == 1:
+                return await transcriber(segments[0], mime_type)
+            semaphore = asyncio.Semaphore(TRANSCRIBE_CONCURRENCY)
+
+            async def run(segment):
+                async with semaphore:
+                    return await transcriber(segment, mime_type)
+
+            tasks = [asyncio.create_task(run(segment)) for segment in segments]
+            try:
+                texts = await asyncio.gather(*tasks)
+            finally:
+                # 任一片段出错时取消其余片段
+                for task in tasks:
+                    task.cancel()
+            return stitch_transcripts(texts)
+        except Exception as e:
+            print(f"Error during transcription: {e}")
+            raise TranscriptionError(str(e)) from e
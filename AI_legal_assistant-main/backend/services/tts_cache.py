@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from services.redis_service import redis_client
+from services.metrics_service import MetricsService
+
+# 进程内缓存的 PCM 总字节数上限
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# 是否同时写入 Redis，供其他 worker 和重启后使用
+TTS_CACHE_REDIS = os.getenv("TTS_CACHE_REDIS", "0") == "1"
+TTS_CACHE_TTL = int(os.getenv("TTS_CACHE_TTL", str(7 * 24 * 3600)))
+
+_whitespace = re.compile(r"\s+")
+
+
+def _redis_key(key):
+    return f"tts:{key}"
+
+
+class TtsCache:
+    """
+    合成语音缓存：键为 (规范化文本, 音色, 模型) 的哈希，值为 PCM 数据。
+    第一层是按字节数限制的进程内 LRU，可选第二层 Redis
+    """
+
+    _entries = OrderedDict()
+    _lock = threading.Lock()
+    _bytes = 0
+    _hits = 0
+    _redis_hits = 0
+    _misses = 0
+
+    @staticmethod
+    def key(text, voice, model):
+        text = _whitespace.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+        fingerprint = json.dumps([text, voice, model], ensure_ascii=False)
+        return hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    async def get(key):
+        with TtsCache._lock:
+            audio = TtsCache._entries.get(key)
+            if audio is not None:
+                TtsCache._entries.move_to_end(key)
+                TtsCache._hits += 1
+                return audio
+        if TTS_CACHE_REDIS:
+            audio = await redis_client.get(_redis_key(key))
+            if audio is not None:
+                TtsCache._remember(key, audio)
+                with TtsCache._lock:
+                    TtsCache._hits += 1
+                    TtsCache._redis_hits += 1
+                return audio
+        with TtsCache._lock:
+            TtsCache._misses += 1
+        return None
+
+    @staticmethod
+    async def set(key, audio):
+        TtsCache._remember(key, audio)
+        if TTS_CACHE_REDIS:
+            await redis_client.set(_redis_key(key), audio, ex=TTS_CACHE_TTL)
+
+    @staticmethod
+    def _remember(key, audio):
+        # 单条超过上限的音频不进入内存层
+        if len(audio) > TTS_CACHE_MAX_BYTES:
+            return
+        with TtsCache._lock:
+            previous = TtsCache._entries.pop(key, None)
+            if previous is not None:
+                TtsCache._bytes -= len(previous)
+            TtsCache._entries[key] = audio
+            TtsCache._bytes += len(audio)
+            while TtsCache._bytes > TTS_CACHE_MAX_BYTES:
+                _, evicted = TtsCache._entries.popitem(last=False)
+                TtsCache._bytes -= len(evicted)
+
+    @staticmethod
+    def stats():
+        with TtsCache._lock:
+            lookups = TtsCache._hits + TtsCache._misses
+            return {
+                "entries": len(TtsCache._entries),
+                "bytes": TtsCache._bytes,
+                "max_bytes": TTS_CACHE_MAX_BYTES,
+                "hit": TtsCache._hits,
+                "redis_hit": TtsCache._redis_hits,
+                "miss": TtsCache._misses,
+                "hit_rate": round(TtsCache._hits / lookups, 4) if lookups else None,
+            }
+
+
+MetricsService.register_gauge("tts_cache", TtsCache.stats)
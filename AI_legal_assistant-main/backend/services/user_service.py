@@ -1,10 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.user_schema import UserRegisterRequest, UserLoginRequest
 from models.user_model import User
 from passlib.context import CryptContext
 from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from utils.encrypt_util import hash_password, check_password
+from services.password_service import PasswordService
 from security.jwt import generate_token
 from security.get_current_user import get_current_user
 from fastapi import Depends
@@ -12,27 +13,27 @@ from fastapi import Depends
 
 class UserService:
     @staticmethod
-    def user_register(db: Session, data: UserRegisterRequest):
+    async def user_register(db: AsyncSession, data: UserRegisterRequest):
         # 检查邮箱是否已存在
-        user = db.query(User).filter(User.email == data.email).first()
+        user = await UserService._find_credentials(db, data.email)
         if user:
             raise HTTPException(status_code=400, detail="Email already exists")
         # 创建新用户
-        user = User(email=data.email, password=hash_password(data.password),
+        user = User(email=data.email, password=await PasswordService.hash(data.password),
                     username=data.username)
         db.add(user)
-        db.commit()
+        await db.commit()
         token = generate_token(
             {"user_id": user.id}
         )
         return JSONResponse(status_code=200, content={"message": "OK", "token": token})
 
     @staticmethod
-    def user_login(db: Session, data: UserLoginRequest):
-        user = db.query(User).filter(User.email == data.email).first()
+    async def user_login(db: AsyncSession, data: UserLoginRequest):
+        user = await UserService._find_credentials(db, data.email)
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
-        if not check_password(user.password, data.password):
+        if not await PasswordService.verify(user.password, data.password):
             raise HTTPException(status_code=400, detail="Incorrect password")
         token = generate_token(
             {"user_id": user.id}
@@ -40,9 +41,21 @@ class UserService:
         return JSONResponse(status_code=200, content={"message": "OK", "token": token})
 
     @staticmethod
-    def user_info(db: Session, current_user):
-        user = db.query(User).filter(
-            User.id == current_user["user_id"]).first()
+    async def _find_credentials(db: AsyncSession, email):
+        """
+        只查询 id 和密码哈希，并立即结束事务归还连接，
+        避免等待 bcrypt 期间占用连接池
+        """
+        result = await db.execute(
+            select(User.id, User.password).where(User.email == email).limit(1))
+        row = result.first()
+        await db.commit()
+        return row
+
+    @staticmethod
+    async def user_info(db: AsyncSession, current_user):
+        user = await db.scalar(
+            select(User).where(User.id == current_user["user_id"]))
         if not user:
             raise HTTPException(status_code=400, detail="User not found")
         return user.as_dict()
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+import types
+
+# 必须在导入应用模块之前设置：内存 SQLite、测试用的密钥和 Redis 地址
+os.environ["DATABASE_URL"] = "sqlite+aiosqlite://"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+import httpx
+import pytest
+import services.redis_service as redis_service
+
+# 其他模块通过 from services.redis_service import redis_client 取得客户端，
+# 在它们被导入之前替换成 fakeredis
+redis_service.redis_client = fakeredis.FakeAsyncRedis()
+
+import main
+import utils.ai_util as ai_util
+from services.session_cache import SessionCache
+
+
+class FakeModels:
+    """
+    模拟 client.aio.models：每次调用等待 delay 秒后返回带序号的回复
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        number = self.calls
+        await asyncio.sleep(self.delay)
+        return types.SimpleNamespace(text=f"reply {number}")
+
+    async def generate_content_stream(self, model, contents, config=None):
+        async def chunks():
+            for text in ("hel", "lo"):
+                await asyncio.sleep(self.delay)
+                yield types.SimpleNamespace(text=text)
+        return chunks()
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def model(monkeypatch):
+    models = FakeModels()
+    monkeypatch.setattr(ai_util, "client", types.SimpleNamespace(
+        aio=types.SimpleNamespace(models=models)))
+    return models
+
+
+@pytest.fixture
+async def redis():
+    await redis_service.redis_client.flushall()
+    # 进程内的会话缓存是类级别状态，随 Redis 一起清空，避免在测试之间串用
+    SessionCache._entries.clear()
+    return redis_service.redis_client
+
+
+@pytest.fixture
+async def client(redis, model):
+    # 内存数据库随 lifespan 结束时释放连接而清空，每个测试都从空库开始
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            yield http
+
+
+async def register(client, email="user@example.com", password="secret"):
+    response = await client.post("/user/register", json={
+        "email": email, "password": password, "username": email.split("@")[0]})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
@@ -0,0 +1,85 @@
+import pytest
+from conftest import register
+
+pytestmark = pytest.mark.anyio
+
+CASE = {"case_description": "contract dispute", "location": "Sydney",
+        "prosecute_date": "2024-10-25T14:30:00"}
+
+
+async def test_register_login_info(client):
+    headers = await register(client)
+    response = await client.post("/user/login", json={
+        "email": "user@example.com", "password": "secret"})
+    assert response.status_code == 200
+    assert response.json()["token"]
+
+    response = await client.post("/user/login", json={
+        "email": "user@example.com", "password": "wrong"})
+    assert response.status_code == 400
+
+    response = await client.get("/user/info", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["email"] == "user@example.com"
+
+    response = await client.get("/user/info")
+    assert response.status_code == 401
+
+
+async def test_chat_is_persisted(client):
+    headers = await register(client)
+    response = await client.post("/ai/init_model", json={"case_type": "civil", **CASE},
+                                 headers=headers)
+    session_id, case_id = response.json()["session_id"], response.json()["case_id"]
+
+    for prompt in ("first", "second"):
+        response = await client.post("/ai/chat", json={
+            "session_id": session_id, "case_id": case_id, "prompt": prompt}, headers=headers)
+        assert response.status_code == 200
+
+    response = await client.get(f"/ai/case_detail/{case_id}", headers=headers)
+    history = response.json()["history_conversation"]
+    assert [(m["role"], m["parts"][0]["text"]) for m in history] == [
+        ("user", "first"), ("model", "reply 1"), ("user", "second"), ("model", "reply 2")]
+
+
+async def test_case_list_pages_through_every_case(client):
+    headers = await register(client)
+    for i in range(7):
+        await client.post("/ai/init_model", json={"case_type": f"type {i}", **CASE},
+                          headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/ai/case_list", params=params, headers=headers)).json()
+        assert len(page["cases"]) <= 3
+        seen.extend(case["case_type"] for case in page["cases"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert sorted(seen) == [f"type {i}" for i in range(7)]
+
+
+async def test_case_delete_only_deletes_own_cases(client):
+    owner = await register(client, "owner@example.com")
+    response = await client.post("/ai/init_model", json={"case_type": "civil", **CASE},
+                                 headers=owner)
+    session_id, case_id = response.json()["session_id"], response.json()["case_id"]
+    await client.post("/ai/chat", json={
+        "session_id": session_id, "case_id": case_id, "prompt": "first"}, headers=owner)
+
+    other = await register(client, "other@example.com")
+    for missing in (case_id, "no-such-case"):
+        response = await client.post("/ai/case_delete", json={"case_id": missing},
+                                     headers=other)
+        assert response.status_code == 404
+
+    response = await client.get(f"/ai/case_detail/{case_id}", headers=owner)
+    assert len(response.json()["history_conversation"]) == 2
+
+    response = await client.post("/ai/case_delete", json={"case_id": case_id}, headers=owner)
+    assert response.status_code == 200
+    response = await client.get(f"/ai/case_detail/{case_id}", headers=owner)
+    assert response.status_code == 404
@@ -0,0 +1,40 @@
+import asyncio
+import time
+import anyio.to_thread
+import pytest
+from conftest import register
+
+pytestmark = pytest.mark.anyio
+
+MODEL_LATENCY = 0.5
+REQUESTS = 40
+THREADS = 4
+
+
+async def test_concurrent_chats_are_not_capped_by_the_threadpool(client, model):
+    headers = await register(client)
+    sessions = []
+    for i in range(REQUESTS):
+        response = await client.post("/ai/init_model", json={
+            "case_type": f"type {i}", "case_description": "d", "location": "l",
+            "prosecute_date": "2024-10-25T14:30:00"}, headers=headers)
+        sessions.append(response.json())
+
+    # 线程池只留 4 个线程：如果模型调用仍占用线程，40 个请求至少要 10 轮模型延迟
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = THREADS
+    model.delay = MODEL_LATENCY
+    try:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/ai/chat", json={"session_id": session["session_id"],
+                                          "case_id": session["case_id"], "prompt": "hi"},
+                        headers=headers)
+            for session in sessions])
+        elapsed = time.perf_counter() - start
+    finally:
+        limiter.total_tokens = 40
+
+    assert all(response.status_code == 200 for response in responses)
+    assert model.calls == REQUESTS
+    assert elapsed < MODEL_LATENCY * 3, elapsed
@@ -0,0 +1,61 @@
+import pytest
+import services.context_service as context_service
+from services.context_service import ContextService
+from services.session_service import SessionService
+
+pytestmark = pytest.mark.anyio
+
+
+def _message(role, number):
+    return {"role": role, "parts": [{"text": f"message {number} " + "word " * 40}]}
+
+
+async def _session(turns):
+    await SessionService.create("s", "system prompt")
+    for number in range(turns):
+        await SessionService.append("s", _message("user", number), _message("model", number))
+
+
+async def test_fold_keeps_recent_messages(redis, model, monkeypatch):
+    monkeypatch.setattr(context_service, "CONTEXT_TOKEN_BUDGET", 300)
+    await _session(10)
+    system_prompt, summary, history = await SessionService.load("s")
+    history.append(_message("user", "new"))
+
+    instruction, contents = await ContextService.build("s", system_prompt, summary, history)
+
+    _, stored_summary, stored = await SessionService.load("s")
+    assert stored_summary == "reply 1"
+    assert stored_summary in instruction
+    # 折叠后剩下的消息加上本轮用户消息就是发给模型的内容
+    assert stored + [history[-1]] == contents
+
+
+async def test_stale_turn_does_not_fold_twice(redis, model, monkeypatch):
+    monkeypatch.setattr(context_service, "CONTEXT_TOKEN_BUDGET", 300)
+    await _session(10)
+    # 两个请求加载了同一份历史
+    system_prompt, summary_a, history_a = await SessionService.load("s")
+    _, summary_b, history_b = await SessionService.load("s")
+    history_a.append(_message("user", "a"))
+    history_b.append(_message("user", "b"))
+
+    await ContextService.build("s", system_prompt, summary_b, history_b)
+    _, folded_summary, remaining = await SessionService.load("s")
+
+    # A 在 B 折叠并释放锁之后才拿到锁，不能再按旧的条数裁剪
+    instruction, _ = await ContextService.build("s", system_prompt, summary_a, history_a)
+
+    _, summary, history = await SessionService.load("s")
+    assert model.calls == 1
+    assert summary == folded_summary
+    assert history == remaining
+    assert folded_summary in instruction
+    assert not await redis.exists("session:s:fold_lock")
+
+
+async def test_fold_is_rejected_when_summary_changed(redis):
+    await _session(4)
+    assert not await SessionService.fold("s", "new summary", 2, previous_summary="other")
+    _, summary, history = await SessionService.load("s")
+    assert summary is None and len(history) == 8
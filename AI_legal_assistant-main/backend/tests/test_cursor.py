@@ -0,0 +1,30 @@
+import base64
+import json
+import pytest
+from conftest import register
+
+pytestmark = pytest.mark.anyio
+
+
+def _cursor(value):
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode().rstrip("=")
+
+
+BAD_CURSORS = ["e30", "W10", "not a cursor", _cursor({"seq": "x"}), _cursor(None),
+               _cursor({"created_at": "x", "id": 1}), _cursor({"created_at": 1, "id": "a"}), _cursor({"created_at": "2024-10-25T14:30:00", "id": 1}),
+               _cursor({"created_at": "2024-10-25T14:30:00+08:00", "id": 1}),
+               _cursor({"rating": "NaN", "id": 1}), _cursor({"rating": "4.5", "id": True}),
+               _cursor({"rating": "4.5", "id": 2 ** 64}), _cursor({"seq": 1, "extra": 1})]
+
+
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+async def test_malformed_cursor_is_rejected(client, cursor):
+    headers = await register(client)
+    response = await client.post("/ai/init_model", json={
+        "case_type": "civil", "case_description": "d", "location": "l",
+        "prosecute_date": "2024-10-25T14:30:00"}, headers=headers)
+    case_id = response.json()["case_id"]
+
+    for path in (f"/ai/case_history/{case_id}", "/ai/case_list", "/lawyer/search"):
+        response = await client.get(path, params={"cursor": cursor}, headers=headers)
+        assert response.status_code == 400, (path, response.text)
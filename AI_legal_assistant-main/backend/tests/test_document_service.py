@@ -0,0 +1,65 @@
+import asyncio
+import time
+import pytest
+import services.document_service as document_service
+from services.context_service import estimate_tokens
+from services.document_service import DocumentService, chunk_pages
+
+CHUNK_LATENCY = 0.1
+CHUNKS = 8
+
+PAGES = [
+    "Section 1 Definitions\n" + "The tenant means the person renting. " * 30,
+    "Section 2 Rent\n1. Rent is paid monthly.\n\n2. Late rent attracts a fee.\n" * 6,
+    "第一条 租金按月支付。\n第二条 押金为两个月租金。\n" * 20,
+    "no break at all " * 200,
+]
+
+
+def test_chunk_pages_round_trips_the_text():
+    chunks = chunk_pages(PAGES, budget=50)
+    assert "".join(chunks) == "".join(PAGES)
+    assert len(chunks) > len(PAGES)
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+
+
+@pytest.fixture
+def mock_analysis(monkeypatch):
+    merged = []
+
+    async def chunk_analysis(chunk, number, total):
+        await asyncio.sleep(CHUNK_LATENCY)
+        return f"finding {number}"
+
+    async def merge(findings):
+        merged.append(list(findings))
+        return "merged"
+
+    monkeypatch.setattr(document_service, "ai_document_chunk_analysis", chunk_analysis)
+    monkeypatch.setattr(document_service, "ai_document_merge", merge)
+    return merged
+
+
+async def _timed_analyze(monkeypatch, concurrency):
+    monkeypatch.setattr(document_service, "DOCUMENT_CHUNK_CONCURRENCY", concurrency)
+    # 每页约占四分之三的预算，两页放不进同一块，正好分成 CHUNKS 块
+    budget = document_service.DOCUMENT_CHUNK_TOKENS
+    pages = [f"{number}".ljust(budget * 3, ".") for number in range(CHUNKS)]
+    start = time.perf_counter()
+    result = await DocumentService.analyze(pages)
+    return result, time.perf_counter() - start
+
+
+@pytest.mark.anyio
+async def test_wall_time_drops_as_concurrency_rises(monkeypatch, mock_analysis):
+    timings = {}
+    for concurrency in (1, 4, CHUNKS):
+        result, timings[concurrency] = await _timed_analyze(monkeypatch, concurrency)
+        assert result == "merged"
+        # 合并时各块结论保持原文顺序
+        assert mock_analysis[-1] == [f"finding {number}" for number in range(1, CHUNKS + 1)]
+
+    assert timings[1] >= CHUNK_LATENCY * CHUNKS
+    assert timings[4] < timings[1] / 2, timings
+    assert timings[CHUNKS] < timings[4] * 0.75, timings
+    assert timings[CHUNKS] < CHUNK_LATENCY * 2, timings
@@ -0,0 +1,55 @@
+import asyncio
+import time
+import pytest
+import services.password_service as password_service
+from conftest import register
+
+pytestmark = pytest.mark.anyio
+
+LOGINS = 8
+# 登录洪峰期间其他请求的最大延迟；bcrypt 阻塞事件循环时会接近整个洪峰的耗时
+INFO_LATENCY_BOUND = 0.2
+
+CREDENTIALS = {"email": "user@example.com", "password": "secret"}
+
+
+async def _poll_info(client, headers, done):
+    latencies = []
+    while not done.is_set():
+        start = time.perf_counter()
+        response = await client.get("/user/info", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200
+        await asyncio.sleep(0.02)
+    return latencies
+
+
+async def test_login_burst_does_not_stall_other_requests(client):
+    headers = await register(client)
+    done = asyncio.Event()
+    poller = asyncio.create_task(_poll_info(client, headers, done))
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*[
+        client.post("/user/login", json=CREDENTIALS) for _ in range(LOGINS)])
+    burst = time.perf_counter() - start
+    done.set()
+    latencies = await poller
+
+    assert all(response.status_code == 200 for response in responses)
+    assert burst > INFO_LATENCY_BOUND * 2, burst
+    assert len(latencies) > 3
+    assert max(latencies) < INFO_LATENCY_BOUND, (max(latencies), burst)
+
+
+async def test_login_overflow_returns_503(client, monkeypatch):
+    await register(client)
+    monkeypatch.setattr(password_service, "PASSWORD_HASH_MAX_PENDING", 2)
+
+    responses = await asyncio.gather(*[
+        client.post("/user/login", json=CREDENTIALS) for _ in range(LOGINS)])
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == 2
+    assert statuses.count(503) == LOGINS - 2
+    assert password_service.PasswordService.stats()["rejected"] >= LOGINS - 2
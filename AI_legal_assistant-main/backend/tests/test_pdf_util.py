@@ -0,0 +1,27 @@
+import os
+import fitz
+import utils.pdf_util as pdf_util
+
+
+def _segments():
+    # SharedMemory 创建的段以 psm_ 开头，进程池自身的信号量不计入
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")}
+
+
+def _pdf(pages):
+    doc = fitz.open()
+    for number in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {number}")
+    return doc.tobytes()
+
+
+def test_parallel_extraction_keeps_page_order(monkeypatch):
+    monkeypatch.setattr(pdf_util, "PDF_PARALLEL_PAGES", 4)
+    monkeypatch.setattr(pdf_util, "PDF_WORKERS", 3)
+    segments = _segments()
+
+    pages = pdf_util.extract_pages_from_pdf(_pdf(10))
+
+    assert [page.strip() for page in pages] == [f"page {number}" for number in range(10)]
+    # 共享内存在提取结束后释放
+    assert _segments() <= segments
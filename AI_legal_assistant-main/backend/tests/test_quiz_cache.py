@@ -0,0 +1,60 @@
+import asyncio
+import json
+import pytest
+import services.quiz_cache as quiz_cache
+from services.quiz_cache import QuizCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def fast_poll(monkeypatch):
+    monkeypatch.setattr(quiz_cache, "QUIZ_POLL_INTERVAL", 0.01)
+
+
+async def test_does_not_release_a_lock_taken_over_by_another_worker(redis):
+    async def generate():
+        # 生成超过了锁的过期时间，另一个 worker 已经拿到锁
+        await redis.set("quiz:1:lock", "other")
+        return ["question"]
+
+    assert await QuizCache.get(1, "v1", generate) == ["question"]
+    assert await redis.get("quiz:1:lock") == b"other"
+
+
+async def test_waits_for_the_worker_holding_the_lock(redis, fast_poll):
+    await redis.set("quiz:1:lock", "other", ex=60)
+    calls = []
+
+    async def generate():
+        calls.append(1)
+        return ["mine"]
+
+    async def other_worker():
+        await asyncio.sleep(0.05)
+        await redis.set("quiz:1", json.dumps({"version": "v1", "questions": ["theirs"]}))
+        await redis.delete("quiz:1:lock")
+
+    questions, _ = await asyncio.gather(QuizCache.get(1, "v1", generate), other_worker())
+    assert questions == ["theirs"]
+    assert calls == []
+    assert not await redis.exists("quiz:1:lock")
+
+
+async def test_generates_under_its_own_lock_after_the_holder_gives_up(redis, fast_poll):
+    await redis.set("quiz:1:lock", "other", ex=60)
+    held = []
+
+    async def generate():
+        held.append(await redis.get("quiz:1:lock"))
+        return ["mine"]
+
+    async def other_worker():
+        # 持锁的 worker 生成失败，没有写入缓存就释放了锁
+        await asyncio.sleep(0.05)
+        await redis.delete("quiz:1:lock")
+
+    questions, _ = await asyncio.gather(QuizCache.get(1, "v1", generate), other_worker())
+    assert questions == ["mine"]
+    assert held[0] not in (None, b"other")
+    assert not await redis.exists("quiz:1:lock")
@@ -0,0 +1,60 @@
+import pickle
+import pytest
+from services.redis_service import RedisService, RedisCodec, CODEC_FLAGS
+from services.session_service import SessionService
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_legacy_session_is_migrated_through_redis_service(redis, monkeypatch):
+    history = [{"role": "user", "parts": [{"text": "hi"}]},
+               {"role": "model", "parts": [{"text": "hello"}]}]
+    await redis.set("session:s", pickle.dumps({"system": "system prompt", "history": history}))
+    migrated = []
+    migrate = RedisService._migrate
+
+    async def record(key, data, value):
+        migrated.append(key)
+        await migrate(key, data, value)
+
+    monkeypatch.setattr(RedisService, "_migrate", record)
+
+    assert await SessionService.load("s") == ("system prompt", None, history)
+    assert migrated == ["session:s"]
+    assert not await redis.exists("session:s")
+    assert await SessionService.load("s") == ("system prompt", None, history)
+
+
+async def test_mset_sets_ttl_and_mget_keeps_key_order(redis):
+    await RedisService.mset({"a": {"n": 1}, "b": ["x" * 2000]}, ttl=60)
+
+    assert await RedisService.mget(["b", "missing", "a"]) == [["x" * 2000], None, {"n": 1}]
+    assert await RedisService.mget([]) == []
+    for key in ("a", "b"):
+        assert 0 < await redis.ttl(key) <= 60
+        assert not RedisCodec.is_legacy(await redis.get(key))
+
+
+async def test_get_rewrites_pickle_and_keeps_ttl(redis):
+    value = {"system": "prompt", "history": [{"role": "user", "parts": [{"text": "hi"}]}]}
+    await redis.set("k", pickle.dumps(value), ex=500)
+
+    assert await RedisService.get("k") == value
+
+    data = await redis.get("k")
+    assert data[0] in CODEC_FLAGS
+    assert RedisCodec.decode(data) == value
+    assert 0 < await redis.ttl("k") <= 500
+    assert await RedisService.get("k") == value
+
+
+async def test_migrate_skips_values_changed_or_not_json(redis):
+    await redis.set("k", pickle.dumps({"old": 1}))
+    await RedisService._migrate("k", pickle.dumps({"stale": 1}), {"stale": 1})
+    assert pickle.loads(await redis.get("k")) == {"old": 1}
+
+    # 集合无法用 msgpack/JSON 表示，保持 pickle 原样
+    await redis.set("s", pickle.dumps({1, 2}), ex=500)
+    assert await RedisService.get("s") == {1, 2}
+    assert pickle.loads(await redis.get("s")) == {1, 2}
+    assert 0 < await redis.ttl("s") <= 500
@@ -0,0 +1,109 @@
+import pytest
+from services.redis_service import RedisCodec
+from services.session_cache import SessionCache
+from services.session_service import SessionService
+
+pytestmark = pytest.mark.anyio
+
+
+def _message(role, text):
+    return {"role": role, "parts": [{"text": text}]}
+
+
+@pytest.fixture
+def commands(redis, monkeypatch):
+    """
+    记录发往 Redis 的命令：单条命令记命令名，管道记为 "pipeline"
+    """
+    sent = []
+    execute_command = redis.execute_command
+    pipeline = redis.pipeline
+
+    async def record_command(*args, **options):
+        sent.append(args[0])
+        return await execute_command(*args, **options)
+
+    def record_pipeline(*args, **kwargs):
+        sent.append("pipeline")
+        return pipeline(*args, **kwargs)
+
+    monkeypatch.setattr(redis, "execute_command", record_command)
+    monkeypatch.setattr(redis, "pipeline", record_pipeline)
+    return sent
+
+
+async def _session(turns=2):
+    await SessionService.create("s", "system prompt")
+    for number in range(turns):
+        await SessionService.append(
+            "s", _message("user", f"q{number}"), _message("model", f"a{number}"))
+
+
+async def _fresh_load():
+    # 模拟没有本地副本的另一个 worker 读取
+    entries = dict(SessionCache._entries)
+    SessionCache._entries.clear()
+    try:
+        return await SessionService.load("s")
+    finally:
+        SessionCache._entries.clear()
+        SessionCache._entries.update(entries)
+
+
+async def test_hit_serves_local_copy_with_one_version_get(redis, commands):
+    await _session()
+    expected = await _fresh_load()
+    commands.clear()
+
+    assert await SessionService.load("s") == expected
+    assert commands == ["GET"]
+
+
+async def test_write_by_another_worker_is_detected(redis):
+    await _session()
+    await SessionService.load("s")
+    stale = SessionCache.stats()["stale"]
+
+    # 另一个 worker 直接追加消息并递增版本号
+    await redis.rpush("session:s:history", RedisCodec.encode(_message("user", "other")))
+    await redis.incr("session:s:version")
+
+    _, _, history = await SessionService.load("s")
+    assert history[-1] == _message("user", "other")
+    assert SessionCache.stats()["stale"] == stale + 1
+    assert await SessionService.load("s") == await _fresh_load()
+
+
+async def test_advance_drops_entry_when_version_skips(redis):
+    await _session()
+    await SessionService.load("s")
+    await redis.incr("session:s:version")
+
+    await SessionService.append("s", _message("user", "mine"), _message("model", "reply"))
+
+    assert "s" not in SessionCache._entries
+    _, _, history = await SessionService.load("s")
+    assert history[-2:] == [_message("user", "mine"), _message("model", "reply")]
+
+
+async def test_advance_applies_own_write_in_place(redis, commands):
+    await _session()
+    await SessionService.append("s", _message("user", "mine"), _message("model", "reply"))
+    commands.clear()
+
+    assert await SessionService.load("s") == await _fresh_load()
+    assert commands[0] == "GET"
+
+
+async def test_local_copy_after_fold_matches_fresh_read(redis, commands):
+    await _session(turns=3)
+    await SessionService.load("s")
+
+    assert await SessionService.fold("s", "summary of turn 0", 2, previous_summary=None)
+    commands.clear()
+    cached = await SessionService.load("s")
+
+    assert commands == ["GET"]
+    assert cached == await _fresh_load()
+    assert cached[1] == "summary of turn 0"
+    assert cached[2][0] == _message("user", "q1")
@@ -0,0 +1,124 @@
+import asyncio
+import io
+import struct
+import wave
+import pytest
+import services.transcription_service as transcription_service
+from conftest import register
+from services.transcription_service import (
+    TranscriptionService, TranscriptionError, stitch_transcripts)
+from utils.audio_util import wav_header
+
+pytestmark = pytest.mark.anyio
+
+SAMPLE_RATE = 1000
+SECONDS = 10
+
+
+def _wav(seconds=SECONDS):
+    # 每帧的采样值就是帧序号，便于从片段中还原它在原录音中的位置
+    pcm = struct.pack(f"<{seconds * SAMPLE_RATE}h", *range(seconds * SAMPLE_RATE))
+    return wav_header(len(pcm), SAMPLE_RATE, 1, 2) + pcm
+
+
+def _frames(segment):
+    with wave.open(io.BytesIO(segment)) as reader:
+        pcm = reader.readframes(reader.getnframes())
+    return struct.unpack(f"<{len(pcm) // 2}h", pcm)
+
+
+@pytest.fixture
+def short_segments(monkeypatch):
+    # 3 秒一段、重叠 1 秒：10 秒录音切成从 0、2、4、6、8 秒开始的 5 段
+    monkeypatch.setattr(transcription_service, "TRANSCRIBE_SEGMENT_SECONDS", 3)
+    monkeypatch.setattr(transcription_service, "TRANSCRIBE_OVERLAP_SECONDS", 1)
+
+
+async def test_long_wav_is_split_into_overlapping_segments(short_segments):
+    segments = []
+
+    async def transcriber(segment, mime_type):
+        assert mime_type == "audio/wav"
+        segments.append(_frames(segment))
+        return ""
+
+    await TranscriptionService.transcribe(_wav(), transcriber=transcriber)
+
+    segments.sort(key=lambda frames: frames[0])
+    assert [frames[0] for frames in segments] == [0, 2000, 4000, 6000, 8000]
+    assert [len(frames) for frames in segments] == [3000, 3000, 3000, 3000, 2000]
+    for previous, current in zip(segments, segments[1:]):
+        assert previous[-1000:] == current[:1000]
+    assert segments[-1][-1] == SECONDS * SAMPLE_RATE - 1
+
+
+async def test_concurrency_is_bounded(short_segments, monkeypatch):
+    monkeypatch.setattr(transcription_service, "TRANSCRIBE_CONCURRENCY", 2)
+    active = peak = 0
+
+    async def transcriber(segment, mime_type):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return ""
+
+    await TranscriptionService.transcribe(_wav(), transcriber=transcriber)
+    assert peak == 2
+
+
+async def test_segments_are_stitched_in_order(short_segments):
+    texts = {0: "the tenant must give", 2000: "must give thirty days notice",
+             4000: "days notice in writing.", 6000: "In writing. The landlord",
+             8000: "the landlord may"}
+
+    async def transcriber(segment, mime_type):
+        start = _frames(segment)[0]
+        # 越靠前的片段越晚完成，拼接顺序仍按片段顺序
+        await asyncio.sleep((8000 - start) / 100000)
+        return texts[start]
+
+    text = await TranscriptionService.transcribe(_wav(), transcriber=transcriber)
+    assert text == "the tenant must give thirty days notice in writing. The landlord may"
+
+
+def test_stitch_removes_seam_duplicates():
+    assert stitch_transcripts(["Hello there, how are", "how are you today?", ""]) == \
+        "Hello there, how are you today?"
+    assert stitch_transcripts(["no overlap", "between these"]) == "no overlap between these"
+    assert stitch_transcripts(["租客应当提前三十", "提前三十天书面通知", "通知房东。"]) == \
+        "租客应当提前三十天书面通知房东。"
+
+
+async def test_failure_cancels_remaining_segments(short_segments):
+    cancelled = []
+
+    async def transcriber(segment, mime_type):
+        start = _frames(segment)[0]
+        if start == 0:
+            raise RuntimeError("quota exceeded")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(start)
+            raise
+        return ""
+
+    with pytest.raises(TranscriptionError, match="quota exceeded"):
+        await TranscriptionService.transcribe(_wav(), transcriber=transcriber)
+    await asyncio.sleep(0)
+    assert sorted(cancelled) == [2000, 4000, 6000, 8000]
+
+
+async def test_speech_to_text_returns_502_on_failure(client, model):
+    headers = await register(client)
+
+    async def fail(model, contents, config=None):
+        raise RuntimeError("upstream unavailable")
+
+    model.generate_content = fail
+    response = await client.post("/ai/speech_to_text", headers=headers,
+                                 files={"file": ("a.wav", _wav(1), "audio/wav")})
+    assert response.status_code == 502
+    assert response.json() == {"error": "upstream unavailable"}
@@ -1,15 +1,17 @@
-import wave
 import os
 from google import genai
 from google.genai import types
-import uuid
 import json
+from utils.generate_prompt import generate_summary_prompt, generate_document_chunk_prompt, generate_document_merge_prompt
 
 client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
+TTS_MODEL = "gemini-2.5-flash-preview-tts"
+TTS_VOICE = "Leda"
 
-def get_ai_response(history, system_instruction=None):
-    response = client.models.generate_content(
+
+async def get_ai_response(history, system_instruction=None):
+    response = await client.aio.models.generate_content(
         model="gemini-2.0-flash",
         contents=history,
         config=types.GenerateContentConfig(
@@ -19,70 +21,81 @@ def get_ai_response(history, system_instruction=None):
     return response.text
 
 
-def ai_speech_to_text(file_obj):
+async def stream_ai_response(history, system_instruction=None):
     """
-    Transcribe audio using Gemini's native multimodal processing
+    Stream the model reply chunk by chunk as the tokens arrive
     """
-    try:
-        # Reset file pointer to beginning
-        file_obj.seek(0)
-        audio_data = file_obj.read()
-
-        response = client.models.generate_content(
-            model="gemini-2.0-flash-lite",
-            contents=[
-                "Please transcribe this audio into text accurately.",
-                types.Part.from_bytes(
-                    data=audio_data,
-                    mime_type="audio/mpeg"  # Or audio/wav, audio/x-m4a
-                )
-            ]
+    response = await client.aio.models.generate_content_stream(
+        model="gemini-2.0-flash",
+        contents=history,
+        config=types.GenerateContentConfig(
+            system_instruction=system_instruction
         )
-        return response.text
-    except Exception as e:
-        print(f"Error during transcription: {e}")
-        return {"error": str(e)}
-
+    )
+    async for chunk in response:
+        if chunk.text:
+            yield chunk.text
 
-def ai_text_to_speech(text_content):
-    # 为每个请求生成唯一的文件路径
-    output_file = f"temp_audio_{uuid.uuid4().hex}.wav"
 
-    try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash-preview-tts",
-            contents=text_content,
-            config=types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name='Leda'
-                        )
-                    )
-                ),
-            )
-        )
+async def summarize_conversation(previous_summary, messages):
+    """
+    Fold older conversation turns into the rolling session summary
+    """
+    conversation = "\n".join(
+        f"{message['role']}: {part.get('text', '')}"
+        for message in messages for part in message["parts"]
+    )
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=generate_summary_prompt(previous_summary, conversation)
+    )
+    return response.text
 
-        audio_part = response.candidates[0].content.parts[0]
-        if not audio_part.inline_data:
-            return None
 
-        pcm_data = audio_part.inline_data.data
+async def ai_speech_to_text(audio_data, mime_type="audio/mpeg"):
+    """
+    Transcribe audio using Gemini's native multimodal processing
+    """
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash-lite",
+        contents=[
+            "Please transcribe this audio into text accurately.",
+            types.Part.from_bytes(
+                data=audio_data,
+                mime_type=mime_type
+            )
+        ]
+    )
+    return response.text or ""
 
-        with wave.open(output_file, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(24000)
-            wf.writeframes(pcm_data)
 
-        return output_file
-    except Exception as e:
-        print(f"TTS Error: {e}")
-        return None
+async def stream_ai_speech(text_content, voice=TTS_VOICE, model=TTS_MODEL):
+    """
+    Stream the synthesized speech as raw PCM chunks as the provider returns them
+    """
+    response = await client.aio.models.generate_content_stream(
+        model=model,
+        contents=text_content,
+        config=types.GenerateContentConfig(
+            response_modalities=["AUDIO"],
+            speech_config=types.SpeechConfig(
+                voice_config=types.VoiceConfig(
+                    prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                        voice_name=voice
+                    )
+                )
+            ),
+        )
+    )
+    async for chunk in response:
+        if not chunk.candidates or not chunk.candidates[0].content:
+            continue
+        for part in chunk.candidates[0].content.parts or []:
+            if part.inline_data and part.inline_data.data:
+                yield part.inline_data.data
 
 
-def ai_document_analysis(text):
+async def ai_document_analysis(text):
     """
     Analyze a document using Gemini
     :param text: 文档全文（字符串）
@@ -98,7 +111,7 @@ def ai_document_analysis(text):
     )
 
     try:
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.0-flash",
             contents=[
                 analysis_instruction,
@@ -109,3 +122,28 @@ def ai_document_analysis(text):
     except Exception as e:
         print(f"Document analysis error: {e}")
         return {"error": str(e)}
+
+
+async def ai_document_chunk_analysis(chunk, part, total):
+    """
+    Map step: extract the findings of one part of a long document
+    """
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=[
+            generate_document_chunk_prompt(part, total),
+            chunk
+        ]
+    )
+    return response.text
+
+
+async def ai_document_merge(findings):
+    """
+    Reduce step: merge the per-part findings into one analysis
+    """
+    response = await client.aio.models.generate_content(
+        model="gemini-2.0-flash",
+        contents=generate_document_merge_prompt(findings)
+    )
+    return response.text
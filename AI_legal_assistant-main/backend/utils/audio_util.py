@@ -0,0 +1,83 @@
+import io
+import struct
+import wave
+
+# Gemini TTS 输出的 PCM 格式：24kHz、单声道、16 位
+TTS_SAMPLE_RATE = 24000
+TTS_CHANNELS = 1
+TTS_SAMPLE_WIDTH = 2
+
+# 流式输出时总长度未知，按惯例把 RIFF 和 data 的长度字段填成最大值
+UNKNOWN_SIZE = 0xFFFFFFFF
+
+
+def wav_header(data_size=None, sample_rate=TTS_SAMPLE_RATE,
+               channels=TTS_CHANNELS, sample_width=TTS_SAMPLE_WIDTH):
+    """
+    在内存中构造 44 字节的 PCM WAV 文件头；data_size 为 None 表示流式输出
+    """
+    riff_size = UNKNOWN_SIZE if data_size is None else 36 + data_size
+    block_align = channels * sample_width
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", riff_size, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate,
+        sample_rate * block_align, block_align, sample_width * 8,
+        b"data", UNKNOWN_SIZE if data_size is None else data_size,
+    )
+
+
+class AudioError(ValueError):
+    """
+    音频格式无法识别或无法解析
+    """
+
+
+# 按文件头魔数识别容器格式，不信任客户端声明的类型
+def sniff_audio_mime(data):
+    head = bytes(data[:16])
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "audio/wav"
+    if head[:4] == b"FORM" and head[8:12] in (b"AIFF", b"AIFC"):
+        return "audio/aiff"
+    if head[:4] == b"OggS":
+        return "audio/ogg"
+    if head[:4] == b"fLaC":
+        return "audio/flac"
+    if head[4:8] == b"ftyp":
+        return "audio/mp4"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "audio/webm"
+    if head[:3] == b"ID3":
+        return "audio/mpeg"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # 帧同步字之后 layer 位为 00 的是 AAC ADTS，其余是 MPEG 音频帧
+        return "audio/aac" if head[1] & 0x06 == 0 else "audio/mpeg"
+    return None
+
+
+def split_wav(data, segment_seconds, overlap_seconds):
+    """
+    把 PCM WAV 按时长切成首尾重叠的片段，每段都带完整文件头；
+    不超过一段时长时原样返回
+    """
+    try:
+        with wave.open(io.BytesIO(data)) as reader:
+            channels = reader.getnchannels()
+            sample_width = reader.getsampwidth()
+            sample_rate = reader.getframerate()
+            frame_count = reader.getnframes()
+            segment_frames = int(segment_seconds * sample_rate)
+            if frame_count <= segment_frames:
+                return [data]
+            step = max(1, segment_frames - int(overlap_seconds * sample_rate))
+            segments = []
+            for start in range(0, frame_count, step):
+                reader.setpos(start)
+                pcm = reader.readframes(segment_frames)
+                segments.append(wav_header(len(pcm), sample_rate, channels, sample_width) + pcm)
+                if start + segment_frames >= frame_count:
+                    break
+            return segments
+    except (wave.Error, EOFError) as e:
+        raise AudioError(f"Invalid WAV file: {e}")
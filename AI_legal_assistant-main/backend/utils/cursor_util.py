@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from fastapi import HTTPException
+
+
+def encode_cursor(values):
+    """
+    把分页位置编码成不透明的游标字符串
+    """
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, schema):
+    """
+    解码游标并按 schema（字段名 -> 转换函数）逐个字段校验转换；
+    格式、字段或取值不符时返回 400，不让客户端构造的游标进入查询
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, dict) or set(values) != set(schema):
+            raise ValueError("Unexpected cursor fields")
+        return {key: parse(values[key]) for key, parse in schema.items()}
+    except (ValueError, TypeError, ArithmeticError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def cursor_int(value):
+    # bool 是 int 的子类，也要排除；超出 64 位的整数无法绑定到查询参数
+    if isinstance(value, bool) or not isinstance(value, int) or not -2 ** 63 <= value < 2 ** 63:
+        raise ValueError("Invalid integer")
+    return value
+
+
+def cursor_str(value):
+    if not isinstance(value, str):
+        raise ValueError("Invalid string")
+    return value
+
+
+def cursor_datetime(value):
+    if not isinstance(value, str):
+        raise ValueError("Invalid datetime")
+    parsed = datetime.fromisoformat(value)
+    # 数据库中保存的是不带时区的时间
+    if parsed.tzinfo is not None:
+        raise ValueError("Invalid datetime")
+    return parsed
+
+
+def cursor_decimal(value):
+    if not isinstance(value, str):
+        raise ValueError("Invalid decimal")
+    parsed = Decimal(value)
+    if not parsed.is_finite():
+        raise ValueError("Invalid decimal")
+    return parsed
@@ -139,3 +139,64 @@ def generate_recommend_laywer_prompt(lawyers, history, case_type, case_descripti
     }}
     """
     return prompt
+
+
+def generate_summary_prompt(previous_summary, conversation):
+    return f"""
+### Role
+You maintain the running memory of a long conversation between a user and an AI assistant.
+
+### Existing Summary
+{previous_summary or "(none)"}
+
+### New Conversation Turns
+{conversation}
+
+### Task
+Merge the new turns into the existing summary and return one updated summary.
+- Keep every fact, date, amount, name, document and decision the user has stated.
+- Keep the assistant's key conclusions and any open questions.
+- Drop greetings, repetition and formatting.
+- Write compact bullet points in the language of the conversation, no more than 300 words.
+- Return only the summary text.
+"""
+
+
+def generate_document_chunk_prompt(part, total):
+    return f"""
+### Role
+You are a legal document analysis assistant reading a long document in parts.
+
+### Task
+The text below is part {part} of {total} of the same document. Extract from this part only:
+1. Hints about the document type and applicable context.
+2. Key clauses and obligations of the involved parties.
+3. Important rights, limitations, and responsibilities.
+4. Potential legal risks, vague clauses, or unfavorable terms for a general user.
+
+- Quote clause numbers or headings where they appear so the findings can be merged later.
+- Skip sections that are missing from this part instead of guessing.
+- Write compact bullet points, no more than 300 words.
+"""
+
+
+def generate_document_merge_prompt(findings):
+    parts = "\n\n".join(
+        f"### Part {index}\n{finding}" for index, finding in enumerate(findings, start=1))
+    return f"""
+### Role
+You are a legal document analysis assistant.
+
+### Findings From Each Part Of The Document
+{parts}
+
+### Task
+Merge the findings above into one analysis of the whole document and provide:
+1. Document type and applicable context.
+2. Key clauses and obligations of the involved parties.
+3. Important rights, limitations, and responsibilities.
+4. Potential legal risks, vague clauses, or unfavorable terms for a general user.
+
+Remove duplicates, resolve references between parts, and base the analysis strictly on the findings.
+Use clear, professional language.
+"""
@@ -0,0 +1,39 @@
+import re
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+|[一-鿿]")
+_NUMBER_RE = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?")
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def normalize_tag(text):
+    """
+    "Personal Injury" / "personal_injury" -> "personal_injury"
+    """
+    return "_".join(tokenize(text))
+
+
+def expertise_tags(expertise):
+    tags = (normalize_tag(tag) for tag in (expertise or "").split(","))
+    return sorted(set(tag for tag in tags if tag))
+
+
+def _numbers(text):
+    return [float(number.replace(",", "")) for number in _NUMBER_RE.findall(str(text or ""))]
+
+
+def parse_rating(rating):
+    numbers = _numbers(rating)
+    return numbers[0] if numbers else 0.0
+
+
+def parse_price_range(price):
+    """
+    "£180-£480/hr" -> (180.0, 480.0)，"$250/hr" -> (250.0, 250.0)，无法解析时返回 (None, None)
+    """
+    numbers = _numbers(price)
+    if not numbers:
+        return None, None
+    return min(numbers[:2]), max(numbers[:2])
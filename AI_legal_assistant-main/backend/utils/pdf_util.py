@@ -1,12 +1,85 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 import fitz  # PyMuPDF
 
+# 上传 PDF 的大小上限（字节）和页数上限
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(20 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+# 页数超过该值时按页段分发到进程池并行提取
+PDF_PARALLEL_PAGES = int(os.getenv("PDF_PARALLEL_PAGES", "64"))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
 
-def extract_text_from_pdf(pdf_file_path):
-    doc = fitz.open(pdf_file_path)  # 打开PDF文件
-    text = ''
+_executor = None
 
-    for page_num in range(doc.page_count):  # 遍历所有页面
-        page = doc.load_page(page_num)  # 加载页面
-        text += page.get_text()  # 获取页面文本
 
-    return text
+class PdfError(ValueError):
+    """
+    PDF 无法解析或超出页数限制
+    """
+
+
+def _open(data):
+    try:
+        return fitz.open(stream=data, filetype="pdf")  # 直接从内存打开，不落盘
+    except fitz.FileDataError as e:
+        raise PdfError(f"Invalid PDF file: {e}")
+
+
+def iter_page_text(doc, start=0, stop=None):
+    for page_num in range(start, doc.page_count if stop is None else stop):
+        yield doc.load_page(page_num).get_text()
+
+
+def _extract_range(name, size, start, stop):
+    # 在子进程中执行：从共享内存读取 PDF，各自打开文档，只提取分到的页段
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        data = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+    with _open(data) as doc:
+        return list(iter_page_text(doc, start, stop))
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # 不用 fork：从已启动线程池和事件循环的进程 fork 可能继承被占用的锁
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context("forkserver"))
+    return _executor
+
+
+def extract_pages_from_pdf(data):
+    """
+    从内存中的 PDF 字节逐页提取文本，返回每页文本组成的列表；
+    页数较多时把页段分给进程池并行处理
+    """
+    with _open(data) as doc:
+        page_count = doc.page_count
+        if page_count > PDF_MAX_PAGES:
+            raise PdfError(f"PDF has {page_count} pages, the limit is {PDF_MAX_PAGES}")
+        if page_count <= PDF_PARALLEL_PAGES or PDF_WORKERS <= 1:
+            return list(iter_page_text(doc))
+
+    step = -(-page_count // PDF_WORKERS)
+    starts = range(0, page_count, step)
+    # PDF 只拷贝一次到共享内存，每个任务只传名字和页段，不再把整个文件 pickle 给每个子进程
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        shm.buf[:len(data)] = data
+        pages = []
+        for chunk in _get_executor().map(
+                _extract_range, [shm.name] * len(starts), [len(data)] * len(starts),
+                starts, [min(start + step, page_count) for start in starts]):
+            pages.extend(chunk)
+        return pages
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def extract_text_from_pdf(data):
+    return "".join(extract_pages_from_pdf(data))
@@ -30,6 +30,7 @@ import {
     postAiSpeechToText,
     getAiCaseList,
     getAiCaseDetail,
+    getAiCaseHistory,
     postAiTextToSpeech,
     postAiCaseDelete,
     postAiRecommendLawyer
@@ -49,6 +50,15 @@ interface CaseItem {
 
 const { TextArea } = Input;
 
+// Map backend history items ({ role, parts }) to chat messages
+const mapHistory = (items: any[], createdAt: string, idPrefix: string): LocalMessage[] =>
+    items.map((item: any, index: number) => ({
+        id: `${idPrefix}-${index}`,
+        role: item.role === 'model' ? 'assistant' : 'user',
+        content: item.parts && item.parts[0] ? item.parts[0].text : '',
+        timestamp: new Date(createdAt) // Approximate timestamp
+    }));
+
 interface Lawyer {
     id: number;
     name: string;
@@ -88,46 +98,71 @@ export default function AIConsultationPage() {
     const [isListening, setIsListening] = useState(false);
     const [isVoiceMode, setIsVoiceMode] = useState(false);
     const [caseList, setCaseList] = useState<CaseItem[]>([]);
+    // Cursor for the next page of cases (null when every case is loaded)
+    const [caseCursor, setCaseCursor] = useState<string | null>(null);
+    const [isLoadingCases, setIsLoadingCases] = useState(false);
     const [deleteModalOpen, setDeleteModalOpen] = useState(false);
     const [caseToDelete, setCaseToDelete] = useState<string | null>(null);
     const mediaRecorderRef = useRef<MediaRecorder | null>(null);
     const audioChunksRef = useRef<Blob[]>([]);
     const messagesEndRef = useRef<HTMLDivElement>(null);
+    // Cursor for messages older than the loaded page (null when everything is loaded)
+    const [historyCursor, setHistoryCursor] = useState<string | null>(null);
+    const [isLoadingOlder, setIsLoadingOlder] = useState(false);
+    const caseCreatedAtRef = useRef<string>('');
+    // Prepending older messages should keep the scroll position
+    const skipScrollRef = useRef(false);
 
     // Recommended Lawyer State
     const [recommendedLawyer, setRecommendedLawyer] = useState<Lawyer | null>(null);
     const [isRecommending, setIsRecommending] = useState(false);
     const [isLawyerModalOpen, setIsLawyerModalOpen] = useState(false);
 
-    // Fetch case list on mount
-    useEffect(() => {
-        const fetchCases = async () => {
-            try {
-                const res = await getAiCaseList();
-                if (res.status === 200) {
-                    setCaseList(res.data);
-                }
-            } catch (error) {
-                console.error("Failed to fetch case list:", error);
+    const fetchCases = async (cursor?: string) => {
+        setIsLoadingCases(true);
+        try {
+            const res = await getAiCaseList(cursor);
+            if (res.status === 200) {
+                setCaseList(prev => cursor ? [...prev, ...res.data.cases] : res.data.cases);
+                setCaseCursor(res.data.next_cursor || null);
             }
-        };
+        } catch (error) {
+            console.error("Failed to fetch case list:", error);
+        } finally {
+            setIsLoadingCases(false);
+        }
+    };
+
+    // Fetch the first page of cases on mount
+    useEffect(() => {
         fetchCases();
     }, []);
 
+    const handleLoadMoreCases = () => {
+        if (caseCursor && !isLoadingCases) {
+            fetchCases(caseCursor);
+        }
+    };
+
+    // Load the next page when the sidebar is scrolled near the bottom
+    const handleCaseListScroll = (e: React.UIEvent<HTMLDivElement>) => {
+        const { scrollTop, scrollHeight, clientHeight } = e.currentTarget;
+        if (scrollHeight - scrollTop - clientHeight < 80) {
+            handleLoadMoreCases();
+        }
+    };
+
     const handleLoadCase = async (id: string) => {
         try {
             const res = await getAiCaseDetail(id);
             if (res.status === 200) {
                 const data = res.data;
-                const backendHistory = data.history_conversation || [];
-                const mappedMessages: LocalMessage[] = backendHistory.map((item: any, index: number) => ({
-                    id: `history-${index}`,
-                    role: item.role === 'model' ? 'assistant' : 'user',
-                    content: item.parts && item.parts[0] ? item.parts[0].text : '',
-                    timestamp: new Date(data.created_at) // Approximate timestamp
-                }));
+                // case_detail only returns the newest page; older pages are loaded via history_cursor
+                const mappedMessages = mapHistory(data.history_conversation || [], data.created_at, 'history');
 
                 setMessages(mappedMessages);
+                setHistoryCursor(data.history_cursor || null);
+                caseCreatedAtRef.current = data.created_at;
 
                 // Update global store with the loaded case info
                 // Note: We might be missing a valid session_id for old cases if it wasn't persisted.
@@ -151,6 +186,37 @@ export default function AIConsultationPage() {
         }
     };
 
+    const handleLoadOlder = async () => {
+        if (!historyCursor || isLoadingOlder) return;
+        setIsLoadingOlder(true);
+        try {
+            const res = await getAiCaseHistory(case_id, historyCursor);
+            if (res.status === 200) {
+                const olderMessages = mapHistory(res.data.messages || [], caseCreatedAtRef.current, `history-${historyCursor}`);
+                skipScrollRef.current = true;
+                setMessages(prev => [...olderMessages, ...prev]);
+                setHistoryCursor(res.data.next_cursor || null);
+
+                const caseInfo = useStore.getState().caseInfo;
+                changeCaseInfo({
+                    ...caseInfo,
+                    history_conversation: [
+                        ...olderMessages.map(msg => ({
+                            ...msg,
+                            timestamp: msg.timestamp.toISOString()
+                        })),
+                        ...caseInfo.history_conversation
+                    ]
+                });
+            }
+        } catch (error) {
+            console.error("Failed to load older messages:", error);
+            message.error("Failed to load older messages");
+        } finally {
+            setIsLoadingOlder(false);
+        }
+    };
+
     const handleDeleteCase = (e: React.MouseEvent, id: string) => {
         e.stopPropagation();
         setCaseToDelete(id);
@@ -169,6 +235,7 @@ export default function AIConsultationPage() {
                 // If current case is deleted, reset to new consultation
                 if (case_id === caseToDelete) {
                     useStore.getState().resetCaseInfo();
+                    setHistoryCursor(null);
                     setMessages([{
                         id: '1',
                         role: 'assistant',
@@ -206,6 +273,10 @@ export default function AIConsultationPage() {
     };
 
     useEffect(() => {
+        if (skipScrollRef.current) {
+            skipScrollRef.current = false;
+            return;
+        }
         scrollToBottom();
     }, [messages, isThinking]);
 
@@ -512,7 +583,7 @@ export default function AIConsultationPage() {
                             New Consultation
                         </Button>
 
-                        <div className="flex-1 overflow-y-auto space-y-2">
+                        <div className="flex-1 overflow-y-auto space-y-2" onScroll={handleCaseListScroll}>
                             <p className="text-[10px] uppercase tracking-[0.2em] text-slate-500 font-bold px-2 mb-4">Recent Sessions</p>
                             {caseList.map((item) => (
                                 <div
@@ -533,6 +604,16 @@ export default function AIConsultationPage() {
                                     </div>
                                 </div>
                             ))}
+                            {caseCursor && (
+                                <Button
+                                    type="text"
+                                    loading={isLoadingCases}
+                                    onClick={handleLoadMoreCases}
+                                    className="w-full text-xs text-slate-500 hover:text-white"
+                                >
+                                    Load more
+                                </Button>
+                            )}
                         </div>
                     </aside>
 
@@ -569,6 +650,18 @@ export default function AIConsultationPage() {
                         {/* Messages Content */}
                         <div className="flex-1 overflow-y-auto px-4 py-8 md:px-8 custom-scrollbar">
                             <div className="max-w-3xl mx-auto space-y-10 pb-32">
+                                {historyCursor && (
+                                    <div className="flex justify-center">
+                                        <Button
+                                            type="text"
+                                            loading={isLoadingOlder}
+                                            onClick={handleLoadOlder}
+                                            className="h-9 px-4 rounded-full bg-white/[0.03] border border-white/5 text-slate-400 text-xs font-bold hover:text-white transition-all"
+                                        >
+                                            Load earlier messages
+                                        </Button>
+                                    </div>
+                                )}
                                 <AnimatePresence initial={false}>
                                     {messages.map((msg) => (
                                         <motion.div
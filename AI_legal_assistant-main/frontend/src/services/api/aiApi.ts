@@ -37,8 +37,8 @@ export const postAiChat = (
 /**
  * Get the list of cases for the current user
  */
-export const getAiCaseList = () => {
-    return getRequest("/ai/case_list");
+export const getAiCaseList = (cursor?: string, limit = 20) => {
+    return getRequest("/ai/case_list", { cursor, limit });
 };
 
 /**
@@ -48,6 +48,13 @@ export const getAiCaseDetail = (caseId: string) => {
     return getRequest(`/ai/case_detail/${caseId}`);
 };
 
+/**
+ * Get older messages of a case, page by page
+ */
+export const getAiCaseHistory = (caseId: string, cursor?: string, limit = 20) => {
+    return getRequest(`/ai/case_history/${caseId}`, { cursor, limit });
+};
+
 /**
  * Convert speech file to text
  */